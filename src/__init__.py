@@ -1,4 +1,5 @@
 # __init__.py
 
 from .keygen import (generate_private_seed, generate_keys, find_Q2, compute_Pk3)
-from .utils import (InitializeAndAbsorb, SqueezePublicSeed, SqueezeT, SqueezePublicMap, FindPk1, FindPk2, flatten_upper_triangular, select_shake_function,squeeze_bits_from_shake)
\ No newline at end of file
+from .utils import (InitializeAndAbsorb, SqueezePublicSeed, SqueezeT, SqueezePublicMap, SqueezePublicMapStream, IterPkBlocks, FindPk1, FindPk2, FindAllPk1, FindAllPk2, Pk_column_maps, flatten_upper_triangular, select_shake_function,squeeze_bits_from_shake, squeeze_packed_bits_from_shake)
+from .params import (ParameterSet, PARAMETER_SETS, DEFAULT_PARAMETERS, get_parameter_set, parameter_set_for)
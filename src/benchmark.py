@@ -0,0 +1,176 @@
+# benchmark.py
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .drbg import ShakeDRBG
+from .field import random_field_vector
+from .keygen import find_Q2, generate_keys
+from .params import DEFAULT_PARAMETERS, SALT_SIZE, get_parameter_set
+from .sign import (
+    BuildAugmentedMatrix,
+    EliminationWorkspace,
+    GaussianElimination,
+    Sign,
+    SigningKey,
+    generate_public_seed_and_T,
+    hash_message,
+    sign_batch,
+)
+from .signature import encode_signature, encode_signatures
+from .utils import SqueezePublicMap
+from .utils_for_verify import verify_batch, verify_signature
+
+# Semilla de los ShakeDRBG para que salts y vinagres sean los mismos en cada corrida
+BENCHMARK_SEED = 2024
+MESSAGE = b"Mensaje de referencia para las mediciones de LUOV"
+
+
+def benchmark_seed(index, params=DEFAULT_PARAMETERS):
+    """Semilla privada fija para el índice dado, distinta por juego de parámetros."""
+    return hashlib.shake_256(f"{params.name}/{index}".encode("ascii")).digest(32)
+
+
+def measure(function, repeat, batch_size=1, warmup=1):
+    """Mide function() repeat veces y devuelve ops/s, latencias p50/p99 y memoria pico.
+
+    Cada llamada procesa batch_size operaciones. La memoria pico se mide en una
+    pasada aparte con tracemalloc para no afectar los tiempos.
+    """
+    for _ in range(warmup):
+        function()
+
+    timings = np.empty(repeat)
+    for index in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings[index] = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "batch_size": batch_size,
+        "repeat": repeat,
+        "ops_per_s": batch_size * repeat / float(timings.sum()),
+        "mean_ms": float(timings.mean()) * 1e3,
+        "p50_ms": float(np.percentile(timings, 50)) * 1e3,
+        "p99_ms": float(np.percentile(timings, 99)) * 1e3,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def benchmark_parameter_set(params, batch_sizes=(1,), repeat=10):
+    """Mide cada etapa por separado y el flujo completo para un juego de parámetros."""
+    rng = ShakeDRBG(BENCHMARK_SEED.to_bytes(4, "big"), params.name.encode("ascii"))
+    private_seed = benchmark_seed(0, params)
+    public_key, _, _ = generate_keys(private_seed, params)
+    public_seed, T = generate_public_seed_and_T(private_seed, params)
+    C, L, Q1 = SqueezePublicMap(public_seed, params)
+    signing_key = SigningKey(private_seed, params, rng)
+
+    # Un sistema resoluble fijo para medir la eliminación en aislamiento
+    h = hash_message(MESSAGE, bytes(SALT_SIZE), params.m, params)
+    attempt = 0
+    while True:
+        vinegar_bytes = hashlib.shake_256(benchmark_seed(attempt, params)).digest(params.v)
+        vinegar = random_field_vector(vinegar_bytes, params.v)
+        A = BuildAugmentedMatrix(C, L, Q1, T, h, vinegar, params)
+        if GaussianElimination(A) is not None:
+            break
+        attempt += 1
+    workspace = EliminationWorkspace(params.m)
+
+    s, salt = Sign(signing_key, MESSAGE)
+    signature = encode_signature(s, salt, params)
+
+    stages = {
+        "SqueezePublicMap": measure(lambda: SqueezePublicMap(public_seed, params), repeat),
+        "find_Q2": measure(lambda: find_Q2(Q1, T), repeat),
+        "generate_keys": measure(lambda: generate_keys(private_seed, params), repeat),
+        "BuildAugmentedMatrix": measure(
+            lambda: BuildAugmentedMatrix(C, L, Q1, T, h, vinegar, params), repeat
+        ),
+        "GaussianElimination": measure(lambda: GaussianElimination(A, workspace), repeat),
+        "Sign": measure(lambda: Sign(signing_key, MESSAGE), repeat),
+        "Sign_cold": measure(lambda: Sign(private_seed, MESSAGE, params=params, rng=rng), repeat),
+        "verify_signature": measure(
+            lambda: verify_signature(public_key, MESSAGE, signature), repeat
+        ),
+        "verify_signature_stream": measure(
+            lambda: verify_signature(public_key, MESSAGE, signature, cache=None), repeat
+        ),
+    }
+
+    def end_to_end():
+        key, _, _ = generate_keys(private_seed, params)
+        s, salt = Sign(private_seed, MESSAGE, params=params, rng=rng)
+        verify_signature(key, MESSAGE, encode_signature(s, salt, params), cache=None)
+
+    stages["end_to_end"] = measure(end_to_end, repeat)
+
+    # Firma y verificación en lote para cada tamaño
+    batches = {}
+    for batch_size in batch_sizes:
+        messages = [MESSAGE + index.to_bytes(4, "big") for index in range(batch_size)]
+        S, salts = sign_batch(signing_key, messages)
+        items = list(zip(messages, (bytes(row) for row in encode_signatures(S, salts, params))))
+        batches[str(batch_size)] = {
+            "sign_batch": measure(lambda: sign_batch(signing_key, messages), repeat, batch_size),
+            "verify_batch": measure(lambda: verify_batch(public_key, items), repeat, batch_size),
+        }
+
+    return {"parameters": params.name, "stages": stages, "batches": batches}
+
+
+def run_benchmarks(levels=(DEFAULT_PARAMETERS.security_level,), batch_sizes=(1, 16), repeat=10):
+    """Ejecuta las mediciones para cada nivel y devuelve un informe serializable a JSON."""
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "config": {
+            "levels": list(levels),
+            "batch_sizes": list(batch_sizes),
+            "repeat": repeat,
+            "seed": BENCHMARK_SEED,
+        },
+        "results": [
+            benchmark_parameter_set(get_parameter_set(level), batch_sizes, repeat)
+            for level in levels
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mediciones de rendimiento de LUOV")
+    parser.add_argument("--levels", type=int, nargs="+", default=[DEFAULT_PARAMETERS.security_level])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.levels, args.batch_sizes, args.repeat)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
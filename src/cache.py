@@ -0,0 +1,117 @@
+# cache.py
+import threading
+from collections import OrderedDict
+
+from .field import PackedBitMatrix
+from .instrumentation import count
+from .params import DEFAULT_PARAMETERS
+from .utils import SqueezePublicMap, pack_public_map
+
+
+class PublicMapCache:
+    """Caché LRU, segura entre hilos, de la expansión de cada semilla pública.
+
+    get guarda (C, L, Q1) y get_packed guarda (C, L y Q1 preparados con
+    pack_public_map), que es lo único que usan verify_signature y
+    verify_batch; cada forma es una entrada propia. Se limita por número de
+    entradas y por bytes; al superar cualquiera de los dos límites se
+    descartan las entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, public_seed, params=DEFAULT_PARAMETERS):
+        """Devuelve (C, L, Q1) para public_seed, expandiéndolo solo si no está en caché.
+
+        La misma semilla se expande distinto en cada juego de parámetros, así
+        que la entrada se identifica por los dos.
+        """
+        return self._get((params.name, bytes(public_seed), False), params)
+
+    def get_packed(self, public_seed, params=DEFAULT_PARAMETERS):
+        """Devuelve (C, PackedBitMatrix de L y Q1) para public_seed; ver pack_public_map."""
+        return self._get((params.name, bytes(public_seed), True), params)
+
+    def _get(self, key, params):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            count("cache_hits")
+            return entry
+        count("cache_misses")
+
+        # La expansión se hace fuera del lock para no bloquear a otros hilos
+        _, public_seed, packed = key
+        C, L, Q1 = SqueezePublicMap(public_seed, params)
+        if packed:
+            # C es una vista sobre toda la expansión: se copia para no retenerla
+            entry = (C.copy(), pack_public_map(L, Q1, params.v))
+            arrays = (entry[0], entry[1].table)
+        else:
+            entry = arrays = (C, L, Q1)
+        for matrix in arrays:
+            matrix.flags.writeable = False
+        self._insert(key, entry)
+        return entry
+
+    @staticmethod
+    def _size(entry):
+        return sum(
+            item.table.nbytes if isinstance(item, PackedBitMatrix) else item.nbytes
+            for item in entry
+        )
+
+    def _insert(self, key, entry):
+        size = self._size(entry)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = entry
+            self.current_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self.current_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self._size(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """Devuelve los contadores de la caché como diccionario."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+            }
+
+
+# Caché compartida por defecto para verify_signature
+public_map_cache = PublicMapCache()
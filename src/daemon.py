@@ -0,0 +1,364 @@
+# daemon.py
+import asyncio
+import json
+import struct
+from collections import defaultdict
+
+from .cache import PublicMapCache
+from .keystore import KeyStore
+from .params import PARAMETER_SETS
+from .sign import SigningKey, sign_batch
+from .signature import encode_signatures
+from .utils_for_verify import verify_batch
+
+# Protocolo sobre el socket Unix: cada mensaje es una cabecera fija seguida de
+# sus campos de largo variable.
+#   petición:  operación, id de petición, largo de key_id, del mensaje y de la firma
+#              seguidos de key_id, mensaje y firma
+#   respuesta: id de petición, estado, largo de la respuesta, seguidos de la respuesta
+# Un cliente puede enviar varias peticiones sin esperar respuesta; las
+# respuestas llevan el id de su petición y pueden llegar en otro orden.
+REQUEST_HEADER = struct.Struct("<BIHII")
+RESPONSE_HEADER = struct.Struct("<IBI")
+
+OP_SIGN = 1
+OP_VERIFY = 2
+OP_METRICS = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_BUSY = 2
+
+# Límites de los campos de una petición; una petición que los supera se
+# rechaza con STATUS_ERROR y se cierra la conexión sin leer sus campos
+MAX_KEY_ID_SIZE = 256
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+MAX_SIGNATURE_SIZE = max(params.signature_size for params in PARAMETER_SETS.values())
+
+
+def _key_id_bytes(key_id):
+    return key_id.encode("utf-8") if isinstance(key_id, str) else bytes(key_id)
+
+
+class DaemonError(RuntimeError):
+    """Error devuelto por el demonio para una petición."""
+
+
+class DaemonBusy(DaemonError):
+    """El demonio rechazó la petición porque su cola está llena."""
+
+
+class _Batcher:
+    """Acumula peticiones de una misma operación y clave y las despacha en lotes.
+
+    Si no hay un lote en curso la petición se despacha enseguida; mientras hay
+    uno, las nuevas se acumulan hasta max_batch o hasta max_delay segundos,
+    así que el tamaño del lote crece con la carga sin retrasar a una petición aislada.
+    """
+
+    def __init__(self, daemon, kernel):
+        self.daemon = daemon
+        self.kernel = kernel
+        self.pending = []
+        self.in_flight = 0
+        self.timer = None
+
+    def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future))
+        if self.in_flight == 0 or len(self.pending) >= self.daemon.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.daemon.max_delay, self.flush)
+        return future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        while self.pending:
+            batch = self.pending[: self.daemon.max_batch]
+            del self.pending[: self.daemon.max_batch]
+            # Se cuenta en curso desde ya, para que las peticiones que lleguen
+            # antes de que empiece a correr se acumulen en el siguiente lote
+            self.in_flight += 1
+            self.daemon._record_batch(len(batch))
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            # Los núcleos en lote corren en un hilo para no bloquear el bucle de eventos
+            results = await asyncio.get_running_loop().run_in_executor(None, self.kernel, items)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.in_flight -= 1
+            self.daemon.queue_depth -= len(batch)
+            # Lo acumulado mientras este lote corría sale sin esperar el plazo
+            if self.in_flight == 0 and self.pending:
+                self.flush()
+
+
+class SigningDaemon:
+    """Demonio asyncio de firma y verificación sobre un socket Unix.
+
+    signing_keys asocia identificadores con semillas privadas o SigningKey y
+    public_keys con claves (public_seed, Q2) o es un KeyStore. Las claves
+    expandidas y los mapas públicos quedan residentes entre peticiones. Las
+    peticiones concurrentes se agrupan en lotes de hasta max_batch, con una
+    espera máxima de max_delay segundos, y se resuelven con sign_batch y
+    verify_batch. Con más de max_queue peticiones pendientes las nuevas se
+    rechazan con STATUS_BUSY.
+    """
+
+    def __init__(
+        self,
+        signing_keys=None,
+        public_keys=None,
+        max_batch=64,
+        max_delay=0.002,
+        max_queue=1024,
+        cache=None,
+    ):
+        self.signing_keys = {
+            _key_id_bytes(key_id): key if isinstance(key, SigningKey) else SigningKey(key)
+            for key_id, key in (signing_keys or {}).items()
+        }
+        if isinstance(public_keys, KeyStore):
+            self.public_keys = public_keys
+        else:
+            self.public_keys = {
+                _key_id_bytes(key_id): key for key_id, key in (public_keys or {}).items()
+            }
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.cache = PublicMapCache() if cache is None else cache
+
+        self.queue_depth = 0
+        self._batchers = {}
+        self._counters = defaultdict(int)
+        self._server = None
+
+    # Métricas
+
+    def _record_batch(self, size):
+        self._counters["batches"] += 1
+        self._counters["batched_requests"] += size
+        self._counters["max_batch_size"] = max(self._counters["max_batch_size"], size)
+
+    def metrics(self):
+        """Devuelve profundidad de cola, lotes despachados y peticiones por resultado."""
+        batches = self._counters["batches"]
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self._counters["max_queue_depth"],
+            "batches": batches,
+            "mean_batch_size": self._counters["batched_requests"] / batches if batches else 0.0,
+            "max_batch_size": self._counters["max_batch_size"],
+            "signed": self._counters["signed"],
+            "verified": self._counters["verified"],
+            "rejected": self._counters["rejected"],
+            "errors": self._counters["errors"],
+            "cache": self.cache.stats(),
+        }
+
+    # Núcleos en lote
+
+    def _public_key(self, key_id):
+        if isinstance(self.public_keys, KeyStore):
+            return self.public_keys.get(key_id)
+        return self.public_keys[key_id]
+
+    def _batcher(self, op, key_id):
+        batcher = self._batchers.get((op, key_id))
+        if batcher is None:
+            if op == OP_SIGN:
+                signing_key = self.signing_keys[key_id]
+
+                def kernel(messages):
+                    S, salts = sign_batch(signing_key, messages)
+                    return [bytes(row) for row in encode_signatures(S, salts, signing_key.params)]
+
+            else:
+                public_key = self._public_key(key_id)
+
+                def kernel(items):
+                    return [bool(valid) for valid in verify_batch(public_key, items, self.cache)]
+
+            batcher = self._batchers[(op, key_id)] = _Batcher(self, kernel)
+        return batcher
+
+    async def submit(self, op, key_id, message, signature=b""):
+        """Encola una petición y espera su resultado (bytes de firma o bool)."""
+        if self.queue_depth >= self.max_queue:
+            self._counters["rejected"] += 1
+            raise DaemonBusy("Cola llena")
+        key_id = _key_id_bytes(key_id)
+        try:
+            batcher = self._batcher(op, key_id)
+        except KeyError:
+            raise DaemonError(f"Clave desconocida: {key_id!r}") from None
+
+        self.queue_depth += 1
+        self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], self.queue_depth)
+        item = message if op == OP_SIGN else (message, signature)
+        result = await batcher.submit(item)
+        self._counters["signed" if op == OP_SIGN else "verified"] += 1
+        return result
+
+    # Servidor
+
+    async def _respond(self, op, key_id, message, signature):
+        if op == OP_METRICS:
+            return STATUS_OK, json.dumps(self.metrics()).encode("utf-8")
+        if op not in (OP_SIGN, OP_VERIFY):
+            return STATUS_ERROR, b"Operacion desconocida"
+        try:
+            result = await self.submit(op, key_id, message, signature)
+        except DaemonBusy as error:
+            return STATUS_BUSY, str(error).encode("utf-8")
+        except Exception as error:
+            self._counters["errors"] += 1
+            return STATUS_ERROR, str(error).encode("utf-8")
+        if op == OP_VERIFY:
+            return STATUS_OK, b"\x01" if result else b"\x00"
+        return STATUS_OK, result
+
+    async def _handle_request(self, writer, request_id, op, key_id, message, signature):
+        status, payload = await self._respond(op, key_id, message, signature)
+        writer.write(RESPONSE_HEADER.pack(request_id, status, len(payload)) + payload)
+        # Si el cliente no lee sus respuestas, drain detiene a este lector
+        await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(REQUEST_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                op, request_id, key_size, message_size, signature_size = REQUEST_HEADER.unpack(header)
+                if (
+                    key_size > MAX_KEY_ID_SIZE
+                    or message_size > MAX_MESSAGE_SIZE
+                    or signature_size > MAX_SIGNATURE_SIZE
+                ):
+                    payload = b"Peticion demasiado grande"
+                    writer.write(RESPONSE_HEADER.pack(request_id, STATUS_ERROR, len(payload)) + payload)
+                    await writer.drain()
+                    break
+                key_id = await reader.readexactly(key_size)
+                message = await reader.readexactly(message_size)
+                signature = await reader.readexactly(signature_size)
+
+                task = asyncio.create_task(
+                    self._handle_request(writer, request_id, op, key_id, message, signature)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, path):
+        """Empieza a escuchar en el socket Unix path."""
+        self._server = await asyncio.start_unix_server(self._handle_client, path=path)
+        return self._server
+
+    async def close(self):
+        """Deja de aceptar conexiones y espera a que se cierre el servidor."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class DaemonClient:
+    """Cliente asyncio de SigningDaemon; permite varias peticiones en curso por conexión."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting = {}
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, path):
+        reader, writer = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        try:
+            while True:
+                header = await self._reader.readexactly(RESPONSE_HEADER.size)
+                request_id, status, size = RESPONSE_HEADER.unpack(header)
+                payload = await self._reader.readexactly(size)
+                future = self._waiting.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == STATUS_OK:
+                    future.set_result(payload)
+                elif status == STATUS_BUSY:
+                    future.set_exception(DaemonBusy(payload.decode("utf-8")))
+                else:
+                    future.set_exception(DaemonError(payload.decode("utf-8")))
+        except (asyncio.IncompleteReadError, ConnectionError) as error:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(DaemonError(f"Conexión cerrada: {error}"))
+            self._waiting.clear()
+
+    async def _request(self, op, key_id=b"", message=b"", signature=b""):
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+
+        key_id, message, signature = _key_id_bytes(key_id), bytes(message), bytes(signature)
+        self._writer.write(
+            REQUEST_HEADER.pack(op, request_id, len(key_id), len(message), len(signature))
+            + key_id
+            + message
+            + signature
+        )
+        await self._writer.drain()
+        return await future
+
+    async def sign(self, key_id, message):
+        """Firma message con la clave key_id; devuelve la firma codificada."""
+        return await self._request(OP_SIGN, key_id, message)
+
+    async def verify(self, key_id, message, signature):
+        """Verifica una firma codificada con la clave pública key_id."""
+        return await self._request(OP_VERIFY, key_id, message, signature) == b"\x01"
+
+    async def metrics(self):
+        """Devuelve las métricas del demonio como diccionario."""
+        return json.loads(await self._request(OP_METRICS))
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._listener.cancel()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,51 @@
+# drbg.py
+import hashlib
+import os
+import threading
+
+# Separador de dominio para que la salida no coincida con otros usos de SHAKE
+DRBG_DOMAIN = b"LUOV-DRBG"
+DRBG_SEED_SIZE = 32
+
+
+class ShakeDRBG:
+    """Generador determinista de bytes aleatorios basado en SHAKE256.
+
+    Cada pedido devuelve SHAKE256(clave || contador), con un contador propio
+    del generador. Solo el incremento del contador se hace bajo lock, así que
+    varios hilos pueden pedir bytes a la vez sin repetir salidas. Con la misma
+    semilla la secuencia es reproducible; sin semilla se toma de os.urandom.
+
+    Si el proceso se bifurca (fork), el hijo se resiembra con os.urandom en
+    su primer pedido para no repetir la secuencia del padre.
+    """
+
+    def __init__(self, seed=None, personalization=b""):
+        self._lock = threading.Lock()
+        self._seed(os.urandom(DRBG_SEED_SIZE) if seed is None else bytes(seed), personalization)
+
+    def _seed(self, seed, personalization=b""):
+        # Cada campo lleva su largo delante para que (b"ab", b"c") y (b"a", b"bc") no coincidan
+        shake = hashlib.shake_256(DRBG_DOMAIN)
+        for field in (seed, personalization):
+            shake.update(len(field).to_bytes(8, "big"))
+            shake.update(field)
+        self._key = shake.digest(DRBG_SEED_SIZE)
+        self._counter = 0
+        self._pid = os.getpid()
+
+    def reseed(self, entropy=None):
+        """Mezcla entropy (o bytes de os.urandom) en la clave y reinicia el contador."""
+        if entropy is None:
+            entropy = os.urandom(DRBG_SEED_SIZE)
+        with self._lock:
+            self._seed(self._key + bytes(entropy))
+
+    def random_bytes(self, length):
+        """Devuelve length bytes pseudoaleatorios."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._seed(self._key + os.urandom(DRBG_SEED_SIZE))
+            key, counter = self._key, self._counter
+            self._counter += 1
+        return hashlib.shake_256(key + counter.to_bytes(8, "big")).digest(length)
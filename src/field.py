@@ -0,0 +1,232 @@
+# field.py
+
+import numpy as np
+
+from .constants import r
+
+# Polinomio irreducible f(x) = x^7 + x + 1 que define F_{2^7} = F_2[x] / (f)
+IRREDUCIBLE_POLY = 0x83
+FIELD_SIZE = 1 << r
+FIELD_MASK = FIELD_SIZE - 1
+
+
+def _build_tables(degree, poly):
+    """Construye las tablas exp/log, de multiplicación y de inversos de F_{2^r}."""
+    size = 1 << degree
+    order = size - 1
+
+    # x es generador del grupo multiplicativo porque 2^7 - 1 es primo
+    exp = np.zeros(2 * order, dtype=np.uint8)
+    log = np.zeros(size, dtype=np.int64)
+    x = 1
+    for i in range(order):
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & size:
+            x ^= poly
+    exp[order:] = exp[:order]
+
+    # Tabla completa 128 x 128: MUL[a, b] = a * b
+    mul = exp[log[:, None] + log[None, :]]
+    mul[0, :] = 0
+    mul[:, 0] = 0
+
+    # INV[a] = a^(-1), con INV[0] = 0 por convención
+    inv = exp[(order - log) % order]
+    inv[0] = 0
+
+    return exp, log, mul, inv
+
+
+EXP_TABLE, LOG_TABLE, MUL_TABLE, INV_TABLE = _build_tables(r, IRREDUCIBLE_POLY)
+
+# Número de bits en 1 de cada byte
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# Desplazamientos de los r planos de bits de un elemento de F_{2^r}
+BIT_SHIFTS = np.arange(r, dtype=np.uint8)
+
+
+def gf_add(a, b):
+    """Suma (y resta) en F_{2^r}: XOR elemento a elemento."""
+    return np.bitwise_xor(a, b)
+
+
+def gf_mul(a, b):
+    """Multiplica elemento a elemento sobre F_{2^r} usando la tabla completa."""
+    return MUL_TABLE[a, b]
+
+
+def gf_inv(a):
+    """Inverso multiplicativo elemento a elemento (el inverso de 0 se define como 0)."""
+    return INV_TABLE[a]
+
+
+def gf_div(a, b):
+    """Divide elemento a elemento a / b sobre F_{2^r}."""
+    return MUL_TABLE[a, INV_TABLE[b]]
+
+
+def gf_sum(a, axis=None):
+    """Suma sobre F_{2^r} a lo largo de un eje (reducción XOR)."""
+    return np.bitwise_xor.reduce(np.asarray(a, dtype=np.uint8), axis=axis)
+
+
+def gf_dot(a, b):
+    """Producto punto de dos vectores de F_{2^r}."""
+    return gf_sum(gf_mul(a, b), axis=-1)
+
+
+def gf_matmul(A, B):
+    """Producto de matrices sobre F_{2^r} (A: p x q, B: q x s o vector de largo q)."""
+    A = np.asarray(A, dtype=np.uint8)
+    B = np.asarray(B, dtype=np.uint8)
+    if B.ndim == 1:
+        return gf_sum(MUL_TABLE[A, B[None, :]], axis=-1)
+    return gf_sum(MUL_TABLE[A[:, :, None], B[None, :, :]], axis=1)
+
+
+def bit_matvec(B, x):
+    """Producto de una matriz de bits B (p x q) por un vector x de F_{2^r}^q.
+
+    Como los coeficientes de B están en F_2, cada producto es un enmascarado
+    y la suma es una reducción XOR.
+    """
+    B = np.asarray(B, dtype=np.uint8)
+    x = np.asarray(x, dtype=np.uint8)
+    return gf_sum(B * x, axis=-1)
+
+
+def bit_matmul(A, B):
+    """Producto de dos matrices de bits sobre F_2 (admite pilas de matrices).
+
+    Se acumula en float32 para aprovechar BLAS: con menos de 2^24 términos por
+    producto punto la suma es exacta y basta con quedarse con su paridad.
+    """
+    A = np.asarray(A, dtype=np.float32)
+    B = np.asarray(B, dtype=np.float32)
+    return (np.matmul(A, B).astype(np.int64) & 1).astype(np.uint8)
+
+
+def pack_field_elements(X):
+    """Empaqueta los elementos de X (eje final) a r bits cada uno, MSB primero."""
+    X = np.asarray(X, dtype=np.uint8)
+    bits = np.unpackbits(X[..., None], axis=-1)[..., 8 - r :]
+    return np.packbits(bits.reshape(X.shape[:-1] + (X.shape[-1] * r,)), axis=-1)
+
+
+def unpack_field_elements(packed, count):
+    """Separa los primeros count * r bits de packed (eje final) en count elementos de r bits."""
+    packed = np.asarray(packed, dtype=np.uint8)
+    bits = np.unpackbits(packed, axis=-1, count=count * r)
+    bits = bits.reshape(packed.shape[:-1] + (count, r))
+    # packbits rellena por la derecha hasta 8 bits, así que se corre el sobrante
+    return np.packbits(bits, axis=-1)[..., 0] >> (8 - r)
+
+
+def random_field_vector(random_bytes, length):
+    """Convierte `length` bytes aleatorios en un vector de F_{2^r}^length."""
+    return np.frombuffer(random_bytes, dtype=np.uint8, count=length) & FIELD_MASK
+
+
+def pack_bit_rows(B):
+    """Empaqueta las filas de una matriz de bits en palabras uint64.
+
+    Cada fila se rellena con ceros hasta un múltiplo de 64 bits.
+    """
+    B = np.asarray(B, dtype=np.uint8)
+    width = B.shape[-1]
+    padded = np.zeros(B.shape[:-1] + (-(-width // 64) * 64,), dtype=np.uint8)
+    padded[..., :width] = B
+    return np.packbits(padded, axis=-1).view(np.uint64)
+
+
+def word_parity(words):
+    """Paridad (0 o 1) de los bits de cada palabra uint64."""
+    words = words ^ (words >> np.uint64(32))
+    words ^= words >> np.uint64(16)
+    words ^= words >> np.uint64(8)
+    return POPCOUNT_TABLE[words & np.uint64(0xFF)] & 1
+
+
+def packed_bit_matvec(B_words, x):
+    """Igual que bit_matvec, pero con B ya empaquetada por pack_bit_rows.
+
+    x se separa en sus r planos de bits; cada bit del resultado es la
+    paridad del AND entre la fila de B y el plano correspondiente. Las
+    palabras de cada fila se combinan primero con XOR (la paridad de la suma
+    es la suma de las paridades), así que la paridad se calcula una sola vez
+    por fila y plano. x puede tener ejes iniciales (una pila de vectores).
+    """
+    x = np.asarray(x, dtype=np.uint8)
+    planes = pack_bit_rows((x[..., None, :] >> BIT_SHIFTS[:, None]) & 1)
+    # Reducir sobre el eje de palabras con las filas al final, que es contiguo
+    anded = planes[..., :, :, None] & B_words.T
+    parity = word_parity(np.bitwise_xor.reduce(anded, axis=-2))
+    return np.bitwise_or.reduce(parity << BIT_SHIFTS[:, None], axis=-2)
+
+
+# Columnas de una matriz de bits que PackedBitMatrix combina por cada consulta a su tabla.
+# Debe dividir a 8 para que cada byte empaquetado dé un número entero de índices.
+TABLE_GROUP_BITS = 4
+assert 8 % TABLE_GROUP_BITS == 0
+
+# Desplazamientos que separan un byte en sus índices de grupo, el más significativo primero
+_GROUP_SHIFTS = np.arange(8 - TABLE_GROUP_BITS, -1, -TABLE_GROUP_BITS, dtype=np.uint8)
+_GROUP_MASK = np.uint8((1 << TABLE_GROUP_BITS) - 1)
+
+
+class PackedBitMatrix:
+    """Matriz de bits B (p x q) preparada para multiplicarla por vectores de F_{2^r}^q.
+
+    Las columnas de B se empaquetan en palabras uint64 y, para cada grupo de
+    TABLE_GROUP_BITS columnas, se precalculan las sumas XOR de todos sus
+    subconjuntos (método de los cuatro rusos). B x se obtiene por planos de
+    bits de x: cada plano elige en la tabla, con un solo índice por grupo,
+    el XOR de las columnas cuyo bit está en 1, y esas palabras se acumulan
+    con XOR. No hay multiplicaciones ni conteos de bits.
+    """
+
+    __slots__ = ("rows", "table")
+
+    def __init__(self, table, rows):
+        self.rows = rows
+        self.table = table
+
+    @classmethod
+    def from_bits(cls, B):
+        """Construye la tabla a partir de la matriz de bits B (p x q)."""
+        B = np.asarray(B, dtype=np.uint8)
+        rows, cols = B.shape
+        columns = pack_bit_rows(B.T)
+        groups = -(-cols // TABLE_GROUP_BITS)
+
+        padded = np.zeros((groups * TABLE_GROUP_BITS, columns.shape[1]), dtype=np.uint64)
+        padded[:cols] = columns
+        padded = padded.reshape(groups, TABLE_GROUP_BITS, -1)
+
+        # table[g, i] = XOR de las columnas del grupo g cuyos bits están en i (MSB primero)
+        size = 1 << TABLE_GROUP_BITS
+        table = np.zeros((groups, size, columns.shape[1]), dtype=np.uint64)
+        indices = np.arange(size)
+        for bit in range(TABLE_GROUP_BITS):
+            selected = (indices >> (TABLE_GROUP_BITS - 1 - bit)) & 1 == 1
+            table[:, selected] ^= padded[:, bit, None, :]
+        return cls(table, rows)
+
+    def matvec(self, x):
+        """Calcula B x sobre F_{2^r}; x puede tener ejes iniciales (una pila de vectores)."""
+        x = np.asarray(x, dtype=np.uint8)
+        groups = self.table.shape[0]
+
+        # Índice de la tabla para cada plano de bits y grupo de columnas: cada
+        # byte empaquetado se separa en 8 / TABLE_GROUP_BITS índices
+        planes = np.packbits((x[..., None, :] >> BIT_SHIFTS[:, None]) & 1, axis=-1)
+        indices = (planes[..., None] >> _GROUP_SHIFTS) & _GROUP_MASK
+        indices = indices.reshape(planes.shape[:-1] + (planes.shape[-1] * _GROUP_SHIFTS.size,))
+        indices = indices[..., :groups]
+
+        words = np.bitwise_xor.reduce(self.table[np.arange(groups), indices], axis=-2)
+        bits = np.unpackbits(words.view(np.uint8), axis=-1, count=self.rows)
+        return np.bitwise_or.reduce(bits << BIT_SHIFTS[:, None], axis=-2)
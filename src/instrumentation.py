@@ -0,0 +1,147 @@
+# instrumentation.py
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Instrumentación activa; con None (por defecto) los puntos de medición solo
+# comprueban esta variable y no hacen nada más.
+_active = None
+
+
+class Instrumentation:
+    """Acumula tiempos por etapa y contadores de las rutas críticas.
+
+    Si se da callback, se llama como callback(nombre, valor) en cada evento:
+    valor es la duración en segundos para las etapas y la cantidad sumada
+    para los contadores.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._timers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            calls, total = self._timers.get(name, (0, 0.0))
+            self._timers[name] = (calls + 1, total + seconds)
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def add(self, name, amount):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+        if self.callback is not None:
+            self.callback(name, amount)
+
+    def stats(self):
+        """Devuelve {"timers": {etapa: {calls, total_s, mean_s}}, "counters": {...}}."""
+        with self._lock:
+            return {
+                "timers": {
+                    name: {"calls": calls, "total_s": total, "mean_s": total / calls}
+                    for name, (calls, total) in self._timers.items()
+                },
+                "counters": dict(self._counters),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+def enable(callback=None):
+    """Activa la instrumentación global y devuelve la instancia que acumula los datos."""
+    global _active
+    _active = Instrumentation(callback)
+    return _active
+
+
+def disable():
+    """Desactiva la instrumentación; devuelve la instancia que estaba activa (o None)."""
+    global _active
+    previous, _active = _active, None
+    return previous
+
+
+def current():
+    """Instrumentación activa, o None si está desactivada."""
+    return _active
+
+
+@contextmanager
+def instrumented(callback=None):
+    """Activa la instrumentación dentro de un bloque with y restaura el estado anterior."""
+    global _active
+    previous = _active
+    instance = enable(callback)
+    try:
+        yield instance
+    finally:
+        _active = previous
+
+
+def timed(name):
+    """Decorador que registra la duración de cada llamada bajo name."""
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            instance = _active
+            if instance is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                instance.record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class _Stage:
+    __slots__ = ("instance", "name", "start")
+
+    def __init__(self, instance, name):
+        self.instance = instance
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instance.record(self.name, time.perf_counter() - self.start)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Context manager que mide un bloque de código bajo name."""
+    instance = _active
+    if instance is None:
+        return _NULL_STAGE
+    return _Stage(instance, name)
+
+
+def count(name, amount=1):
+    """Suma amount al contador name si la instrumentación está activa."""
+    instance = _active
+    if instance is not None:
+        instance.add(name, amount)
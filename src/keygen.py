@@ -1,17 +1,26 @@
 # keygen.py
 import os
 import numpy as np
-import sys
-from utils import (
-    FindPk1,
-    FindPk2,
+from itertools import islice
+
+from .field import bit_matmul
+from .utils import (
+    FindAllPk1,
+    FindAllPk2,
     InitializeAndAbsorb,
     SqueezePublicSeed,
     SqueezeT,
-    SqueezePublicMap,
+    SqueezePublicMapStream,
 )
-from sign import sign_message
-from constants import m, v, SEED_SIZE
+from .public_key import serialize_public_key
+from .sign import Sign
+from .signature import encode_signature
+from .utils_for_verify import verify_signature
+from .constants import SEED_SIZE
+from .params import DEFAULT_PARAMETERS
+
+# Número de ecuaciones que find_Q2 procesa por contracción
+Q2_BLOCK = 16
 
 
 def generate_private_seed():
@@ -20,24 +29,35 @@ def generate_private_seed():
 
 
 def find_Q2(Q1, T):
-    """Genera la matriz Q2 basada en la matriz T y Q1, ajustada al tamaño esperado."""
-    # Inicializamos Q2 como una matriz binaria con el tamaño correcto
-    Q2 = np.zeros((m, (m * (m + 1)) // 2), dtype=int)
+    """Genera la matriz Q2 basada en la matriz T y Q1, ajustada al tamaño esperado.
 
-    for k in range(1, m):
-        Pk1 = FindPk1(Q1, k, v)
-        Pk2 = FindPk2(Q1, k, v, m)
+    Q1 puede ser la matriz completa o un iterable de sus filas; las ecuaciones
+    se procesan en bloques de Q2_BLOCK con una sola contracción por bloque.
+    Los tamaños v y m se toman de la forma de T.
+    """
+    v, m = T.shape
+    # Inicializamos Q2 como una matriz binaria con el tamaño correcto
+    Q2 = np.zeros((m, (m * (m + 1)) // 2), dtype=np.uint8)
+    rows, cols = np.triu_indices(m)
+    diagonal = np.arange(m)
+
+    Q1_rows = iter(Q1)
+    start = 0
+    while start < m:
+        block = np.array(list(islice(Q1_rows, Q2_BLOCK)), dtype=np.uint8)
+        if block.shape[0] == 0:
+            break
+        end = start + block.shape[0]
+
+        Pk1 = FindAllPk1(block, v)
+        Pk2 = FindAllPk2(block, v, m)
         Pk3 = compute_Pk3(Pk1, Pk2, T)
-        column = 1
-        for i in range(1, m):
-            Q2[k, column] = Pk3[i, i]
-            column += 1
-            for j in range(i + 1, m):
-                Q2[k, column] = Pk3[i, j] + Pk3[j, i]
-                column += 1
 
-    # # Asegurarse de que Q2 sea binaria
-    # Q2 = np.mod(Q2, 2)
+        # Q2[k] es el triángulo superior de Pk3 + Pk3^T con la diagonal de Pk3
+        folded = Pk3 ^ Pk3.transpose(0, 2, 1)
+        folded[:, diagonal, diagonal] = Pk3[:, diagonal, diagonal]
+        Q2[start:end] = folded[:, rows, cols]
+        start = end
 
     # Compactar Q2 usando numpy.packbits
     Q2_packed = np.packbits(Q2, axis=1)
@@ -46,34 +66,35 @@ def find_Q2(Q1, T):
 
 
 def compute_Pk3(Pk1, Pk2, T):
-    """Calcula la matriz Pk3 basada en Pk1, Pk2 y T."""
+    """Calcula la matriz Pk3 basada en Pk1, Pk2 y T (o una pila de ellas)."""
     # Calcula una combinación de formas cuadráticas:
     # La primera parte (-T.T @ Pk1 @ T) evalúa una forma cuadrática negativa,
     # mientras que la segunda parte (T.T @ Pk2) suma un término lineal.
     # En resumen, la expresión devuelve un escalar o matriz que depende de
     # las interacciones entre las matrices T, Pk1, y Pk2.
-    return -T.T @ Pk1 @ T + T.T @ Pk2
+    # Todas son matrices de bits, así que se opera sobre F_2 (restar es sumar).
+    return bit_matmul(T.T, bit_matmul(Pk1, T) ^ Pk2)
 
 
-def generate_keys(private_seed):
+def generate_keys(private_seed, params=DEFAULT_PARAMETERS):
     """Genera un par de claves (pública y privada) según el esquema LUOV."""
 
-    private_sponge = InitializeAndAbsorb(private_seed)
+    private_sponge = InitializeAndAbsorb(private_seed, params)
 
     public_seed = SqueezePublicSeed(private_sponge)
 
     # Generar la matriz T (v x m) con valores aleatorios
-    T = SqueezeT(private_sponge)
+    T = SqueezeT(private_sponge, params)
 
-    # 3. Generar las matrices C, L y Q1 usando la semilla pública
-    C, L, Q1 = SqueezePublicMap(public_seed)
+    # 3. Generar las matrices C, L y las filas de Q1 usando la semilla pública
+    C, L, Q1_rows = SqueezePublicMapStream(public_seed, params)
 
-    Q2 = find_Q2(Q1, T)
+    Q2 = find_Q2(Q1_rows, T)
     public_key = (public_seed, Q2)
     private_key = private_seed
 
-    public_key_size = sys.getsizeof(public_seed) + sys.getsizeof(Q2)
-    public_key_size_kb = public_key_size / 1024
+    # Tamaño real de la clave en el formato serializado
+    public_key_size_kb = len(serialize_public_key(public_key)) / 1024
 
     return public_key, private_key, public_key_size_kb
 
@@ -88,19 +109,19 @@ def main():
     print(f"Tamaño de la clave pública: {public_key_size_kb:.2f} KB")
 
     # Mensaje a firmar
-    message = "Este es el mensaje que estamos firmando"
+    message = "Este es el mensaje que estamos firmando".encode("utf-8")
 
     # Firmar el mensaje
-    signature, salt = sign_message(private_key, message)
+    signature, salt = Sign(private_key, message)
     print(f"Firma: {signature}")
     print(f"Salt: {salt}")
 
-     # Verificar la firma
-     is_valid = verify_signature(public_key, message, signature)
-     if is_valid:
-         print("Firma válida")
-     else:
-         print("Firma inválida")
+    # Verificar la firma
+    is_valid = verify_signature(public_key, message, encode_signature(signature, salt))
+    if is_valid:
+        print("Firma válida")
+    else:
+        print("Firma inválida")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+# keystore.py
+import mmap
+import struct
+
+import numpy as np
+
+from .params import DEFAULT_PARAMETERS
+from .public_key import (
+    HEADER,
+    PUBLIC_SEED_SIZE,
+    load_public_key,
+    serialize_public_key,
+)
+
+# Formato del almacén de claves:
+#   cabecera (16 bytes): b"LKS1", número de claves, tamaño de cada registro
+#   índice: por clave, su identificador (32 bytes, relleno con ceros),
+#           ordenado para búsqueda binaria; como el relleno son ceros, un
+#           identificador no puede terminar en b"\x00"
+#   registros: cada clave pública en el formato de public_key.py, en el
+#           mismo orden que el índice
+# El índice y los registros se leen directamente del archivo mapeado, así que
+# abrir el almacén no depende del número de claves y los procesos que lo
+# abren comparten las páginas a través de la caché del sistema operativo.
+KEYSTORE_MAGIC = b"LKS1"
+KEYSTORE_HEADER = struct.Struct("<4sIQ")
+KEY_ID_SIZE = 32
+
+
+def _key_id_bytes(key_id):
+    if isinstance(key_id, str):
+        key_id = key_id.encode("utf-8")
+    if len(key_id) > KEY_ID_SIZE:
+        raise ValueError(f"El identificador de clave supera {KEY_ID_SIZE} bytes")
+    key_id = bytes(key_id)
+    if key_id.endswith(b"\x00"):
+        raise ValueError("El identificador de clave no puede terminar en b'\\x00'")
+    return key_id
+
+
+def write_keystore(path, keys, params=DEFAULT_PARAMETERS):
+    """Escribe un almacén con las claves públicas dadas como {key_id: (public_seed, Q2)}.
+
+    Todas las claves de un almacén deben ser del mismo juego de parámetros.
+    Lanza ValueError si dos identificadores coinciden una vez codificados
+    (por ejemplo "a" y b"a").
+    """
+    records = sorted(
+        ((_key_id_bytes(key_id), public_key) for key_id, public_key in dict(keys).items()),
+        key=lambda record: record[0],
+    )
+    for (key_id, _), (next_id, _) in zip(records, records[1:]):
+        if key_id == next_id:
+            raise ValueError(f"Identificador de clave repetido: {key_id!r}")
+    record_size = HEADER.size + PUBLIC_SEED_SIZE + params.m * params.Q2_row_bytes
+
+    index = np.zeros(len(records), dtype=f"S{KEY_ID_SIZE}")
+    for position, (key_id, _) in enumerate(records):
+        index[position] = key_id
+
+    with open(path, "wb") as store:
+        store.write(KEYSTORE_HEADER.pack(KEYSTORE_MAGIC, len(records), record_size))
+        store.write(index.tobytes())
+        # Alinear el primer registro a 8 bytes para que Q2 se pueda ver como uint64
+        store.write(b"\x00" * (-store.tell() % 8))
+        for key_id, public_key in records:
+            record = serialize_public_key(public_key)
+            if len(record) != record_size:
+                raise ValueError(f"La clave {key_id!r} no es {params.name}")
+            store.write(record)
+
+
+class KeyHandle:
+    """Referencia a una clave dentro de un almacén mapeado; Q2 es una vista sin copia."""
+
+    __slots__ = ("key_id", "public_seed", "Q2")
+
+    def __init__(self, key_id, public_seed, Q2):
+        self.key_id = key_id
+        self.public_seed = public_seed
+        self.Q2 = Q2
+
+    @property
+    def public_key(self):
+        return self.public_seed, self.Q2
+
+
+class KeyStore:
+    """Almacén de claves públicas de solo lectura respaldado por mmap."""
+
+    def __init__(self, path):
+        with open(path, "rb") as store:
+            self._mapped = mmap.mmap(store.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, record_size = KEYSTORE_HEADER.unpack_from(self._mapped, 0)
+        if magic != KEYSTORE_MAGIC:
+            raise ValueError("Formato de almacén de claves no reconocido")
+        self._count = count
+        self._record_size = record_size
+        self._index = np.frombuffer(
+            self._mapped, dtype=f"S{KEY_ID_SIZE}", count=count, offset=KEYSTORE_HEADER.size
+        )
+        index_end = KEYSTORE_HEADER.size + count * KEY_ID_SIZE
+        self._records_offset = index_end + (-index_end % 8)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key_id):
+        return self._find(_key_id_bytes(key_id)) is not None
+
+    def _find(self, key_id):
+        position = int(np.searchsorted(self._index, key_id))
+        if position < self._count and self._index[position] == key_id:
+            return position
+        return None
+
+    def get(self, key_id):
+        """Devuelve un KeyHandle para key_id; lanza KeyError si no existe."""
+        key_id = _key_id_bytes(key_id)
+        position = self._find(key_id)
+        if position is None:
+            raise KeyError(key_id)
+
+        start = self._records_offset + position * self._record_size
+        record = memoryview(self._mapped)[start : start + self._record_size]
+        public_seed, Q2 = load_public_key(record)
+        return KeyHandle(key_id, public_seed, Q2)
+
+    def close(self):
+        """Cierra el mapeo; si quedan KeyHandle vivos se libera cuando desaparezcan."""
+        self._index = None
+        try:
+            self._mapped.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
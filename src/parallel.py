@@ -0,0 +1,141 @@
+# parallel.py
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .params import DEFAULT_PARAMETERS, get_parameter_set
+from .sign import BATCH_CHUNK, SigningKey, sign_batch
+from .signature import decode_signatures, encode_signatures
+
+# Alineación de cada arreglo dentro del bloque de memoria compartida
+SHARED_ALIGNMENT = 64
+
+# Clave reconstruida en cada proceso trabajador a partir de la memoria compartida
+_worker_key = None
+_worker_memory = None
+
+
+def _shared_layout(signing_key):
+    """Calcula (desplazamiento, forma, dtype) de cada arreglo de la clave en el bloque."""
+    layout = {}
+    offset = 0
+    for name in SigningKey.ARRAYS:
+        array = getattr(signing_key, name)
+        offset += -offset % SHARED_ALIGNMENT
+        layout[name] = (offset, array.shape, array.dtype.str)
+        offset += array.nbytes
+    return layout, max(offset, 1)
+
+
+def _shared_views(buffer, layout):
+    return {
+        name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+        for name, (offset, shape, dtype) in layout.items()
+    }
+
+
+def _init_worker(memory_name, layout, public_seed, security_level):
+    global _worker_key, _worker_memory
+    # Los trabajadores comparten el resource_tracker del proceso principal, que
+    # es quien crea los bloques y los libera en close()
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    arrays = _shared_views(_worker_memory.buf, layout)
+    for array in arrays.values():
+        array.flags.writeable = False
+    # Cada trabajador siembra su propio ShakeDRBG con os.urandom, así que no
+    # repite salts ni vinagres de otros procesos
+    _worker_key = SigningKey.from_arrays(
+        public_seed, arrays, get_parameter_set(security_level)
+    )
+
+
+def _sign_slice(results_name, start, messages):
+    """Firma messages y escribe las firmas codificadas en las filas start... del bloque de resultados."""
+    params = _worker_key.params
+    S, salts = sign_batch(_worker_key, messages)
+
+    results = shared_memory.SharedMemory(name=results_name)
+    try:
+        slots = np.ndarray(
+            (len(messages), params.signature_size),
+            dtype=np.uint8,
+            buffer=results.buf,
+            offset=start * params.signature_size,
+        )
+        slots[:] = encode_signatures(S, salts, params)
+        del slots
+    finally:
+        results.close()
+    return len(messages)
+
+
+class ProcessPoolSigner:
+    """Firma en varios procesos compartiendo una sola copia de la clave expandida.
+
+    La semilla privada se expande una vez en el proceso principal; T, C, L,
+    los tensores Pk1, Pk2 y Fk2 y las tablas de sus productos se copian a un
+    bloque de multiprocessing.shared_memory que los trabajadores ven sin
+    copiar. A cada trabajador solo se le envían los mensajes y la posición de
+    sus resultados, que escribe directamente en otro bloque compartido.
+    """
+
+    def __init__(self, private_seed, processes=None, chunk_size=BATCH_CHUNK, params=DEFAULT_PARAMETERS):
+        if isinstance(private_seed, SigningKey):
+            signing_key = private_seed
+        else:
+            signing_key = SigningKey(private_seed, params)
+        self.params = signing_key.params
+        self.public_seed = signing_key.public_seed
+        self.chunk_size = chunk_size
+
+        layout, size = _shared_layout(signing_key)
+        self._memory = shared_memory.SharedMemory(create=True, size=size)
+        for name, view in _shared_views(self._memory.buf, layout).items():
+            view[...] = getattr(signing_key, name)
+            del view
+
+        self._pool = multiprocessing.Pool(
+            processes,
+            initializer=_init_worker,
+            initargs=(self._memory.name, layout, self.public_seed, self.params.security_level),
+        )
+
+    def sign_batch(self, messages):
+        """Firma messages repartiéndolos entre los procesos; devuelve (S, salts) como sign_batch."""
+        messages = [bytes(message) for message in messages]
+        N = len(messages)
+        signature_size = self.params.signature_size
+        if N == 0:
+            return np.empty((0, self.params.n), dtype=np.uint8), []
+
+        results = shared_memory.SharedMemory(create=True, size=N * signature_size)
+        try:
+            tasks = [
+                self._pool.apply_async(
+                    _sign_slice,
+                    (results.name, start, messages[start : start + self.chunk_size]),
+                )
+                for start in range(0, N, self.chunk_size)
+            ]
+            for task in tasks:
+                task.get()
+
+            encoded = np.ndarray((N, signature_size), dtype=np.uint8, buffer=results.buf).copy()
+        finally:
+            results.close()
+            results.unlink()
+        return decode_signatures(encoded, self.params)
+
+    def close(self):
+        """Termina los procesos trabajadores y libera la memoria compartida."""
+        self._pool.close()
+        self._pool.join()
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,74 @@
+# params.py
+
+from .constants import SECURITY_LEVEL
+
+# Tamaño del salt de cada firma, igual en todos los niveles
+SALT_SIZE = 16
+
+
+class ParameterSet:
+    """Juego de parámetros LUOV-r-m-v con sus tamaños derivados ya calculados."""
+
+    def __init__(self, r, m, v, security_level):
+        self.r = r
+        self.m = m
+        self.v = v
+        self.n = m + v
+        self.security_level = security_level
+        self.name = f"LUOV-{r}-{m}-{v}"
+
+        # Columnas de Q1 (vinagre x todas) y de Q2 (aceite x aceite)
+        self.Q1_columns = (v * (v + 1)) // 2 + v * m
+        self.Q2_columns = (m * (m + 1)) // 2
+
+        # Bits que se extraen de SHAKE para T y para (C, L, Q1); cada fila de
+        # T ocupa ceil(m / 8) bytes de la salida de SHAKE(semilla privada)
+        self.T_bits = v * m
+        self.T_row_bytes = (m + 7) // 8
+        self.public_map_bits = m + m * self.n + m * self.Q1_columns
+
+        # Tamaños en bytes de los formatos serializados
+        self.hash_bytes = (m * r + 7) // 8
+        self.s_bytes = (self.n * r + 7) // 8
+        self.signature_size = self.s_bytes + SALT_SIZE
+        self.Q2_row_bytes = -(-self.Q2_columns // 64) * 8
+
+    def __repr__(self):
+        return f"ParameterSet({self.name}, nivel {self.security_level})"
+
+
+# Conjuntos obligatorios de la especificación, por nivel de seguridad
+PARAMETER_SETS = {
+    1: ParameterSet(7, 57, 197, 1),
+    3: ParameterSet(7, 83, 283, 3),
+    5: ParameterSet(7, 110, 374, 5),
+}
+
+DEFAULT_PARAMETERS = PARAMETER_SETS[SECURITY_LEVEL]
+
+
+def get_parameter_set(level_or_name):
+    """Devuelve el juego de parámetros para un nivel (1, 3, 5) o un nombre "LUOV-r-m-v"."""
+    if isinstance(level_or_name, ParameterSet):
+        return level_or_name
+    for level, params in PARAMETER_SETS.items():
+        if level_or_name in (level, params.name):
+            return params
+    raise ValueError(f"Juego de parámetros no soportado: {level_or_name}")
+
+
+def parameter_set_for(r, m, v):
+    """Busca el juego de parámetros registrado con estos r, m y v."""
+    for params in PARAMETER_SETS.values():
+        if (params.r, params.m, params.v) == (r, m, v):
+            return params
+    raise ValueError(f"Juego de parámetros no soportado: LUOV-{r}-{m}-{v}")
+
+
+def parameters_of_public_key(public_key):
+    """Deduce el juego de parámetros de una clave (public_seed, Q2) por sus m filas."""
+    _, Q2 = public_key
+    for params in PARAMETER_SETS.values():
+        if params.m == Q2.shape[0]:
+            return params
+    raise ValueError(f"Ningún juego de parámetros tiene m = {Q2.shape[0]}")
@@ -0,0 +1,166 @@
+# presign.py
+import threading
+from collections import deque
+
+import numpy as np
+
+from .field import gf_matmul, random_field_vector
+from .instrumentation import count
+from .params import DEFAULT_PARAMETERS, SALT_SIZE
+from .sign import InvertMatrixBatch, SigningKey, hash_message
+
+
+class Presignature:
+    """Trabajo de firma precalculado para un vector de vinagre.
+
+    Guarda el vinagre, la inversa de LHS y la parte de RHS que no depende del
+    hash (C + L (v||0) + v^T Pk1 v). Se puede usar para una sola firma: reusar
+    un vinagre con dos mensajes revelaría información de la clave privada.
+    """
+
+    __slots__ = ("vinegar", "inverse", "offset", "used")
+
+    def __init__(self, vinegar, inverse, offset):
+        self.vinegar = vinegar
+        self.inverse = inverse
+        self.offset = offset
+        self.used = False
+
+    def solve(self, h):
+        """Devuelve la parte de aceite o tal que LHS o = h - offset y borra la entrada."""
+        if self.used:
+            raise RuntimeError("La prefirma ya fue usada")
+        self.used = True
+        o = gf_matmul(self.inverse, h ^ self.offset)
+        self.inverse.fill(0)
+        self.offset.fill(0)
+        return o
+
+
+class PresignPool:
+    """Reserva de prefirmas calculadas fuera de línea para una clave de firma.
+
+    Mantiene hasta depth prefirmas; cuando quedan menos de refill_threshold se
+    rellena, en un hilo aparte si background es True o en la misma llamada si
+    no. Si la reserva está vacía, la firma calcula su prefirma en el momento.
+    Cada prefirma se saca de la reserva bajo un lock, así que nunca se entrega
+    dos veces.
+    """
+
+    def __init__(
+        self,
+        private_seed,
+        depth=32,
+        refill_threshold=8,
+        background=True,
+        params=DEFAULT_PARAMETERS,
+    ):
+        if not 0 <= refill_threshold < depth:
+            raise ValueError("Se requiere 0 <= refill_threshold < depth")
+        if isinstance(private_seed, SigningKey):
+            self.signing_key = private_seed
+        else:
+            self.signing_key = SigningKey(private_seed, params)
+        self.params = self.signing_key.params
+        self.depth = depth
+        self.refill_threshold = refill_threshold
+        self.background = background
+
+        self._entries = deque()
+        self._lock = threading.Lock()
+        self._refill_thread = None
+        self._closed = False
+        self.refill()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def presign(self, size):
+        """Calcula hasta size prefirmas nuevas; descarta los vinagres con LHS singular."""
+        m, v = self.params.m, self.params.v
+        random_bytes = self.signing_key.rng.random_bytes(size * v)
+        V = random_field_vector(random_bytes, size * v).reshape(size, v)
+
+        # Con h = 0 la última columna es la parte de RHS que solo depende del vinagre
+        A = self.signing_key.build_augmented_matrices(np.zeros((size, m), dtype=np.uint8), V)
+        inverses, invertible = InvertMatrixBatch(A[:, :, :m])
+
+        return [
+            Presignature(V[index].copy(), inverses[index], A[index, :, m].copy())
+            for index in np.flatnonzero(invertible)
+        ]
+
+    def refill(self):
+        """Completa la reserva hasta depth prefirmas en el hilo actual."""
+        while not self._closed:
+            with self._lock:
+                missing = self.depth - len(self._entries)
+            if missing <= 0:
+                return
+            entries = self.presign(missing)
+            with self._lock:
+                self._entries.extend(entries[: self.depth - len(self._entries)])
+
+    def _schedule_refill(self):
+        if not self.background:
+            self.refill()
+            return
+        with self._lock:
+            if self._closed or (self._refill_thread is not None and self._refill_thread.is_alive()):
+                return
+            self._refill_thread = threading.Thread(target=self.refill, daemon=True)
+            self._refill_thread.start()
+
+    def take(self):
+        """Saca una prefirma de la reserva (o la calcula si está vacía)."""
+        with self._lock:
+            entry = self._entries.popleft() if self._entries else None
+            remaining = len(self._entries)
+
+        if entry is None:
+            count("presign_misses")
+            while entry is None:
+                entries = self.presign(1)
+                entry = entries[0] if entries else None
+        else:
+            count("presign_hits")
+
+        if remaining < self.refill_threshold:
+            self._schedule_refill()
+        return entry
+
+    def sign(self, message):
+        """Firma message con una prefirma; devuelve (s, salt) igual que Sign."""
+        # Paso 3: Generar un salt aleatorio de 16 bytes
+        salt = self.signing_key.rng.random_bytes(SALT_SIZE)
+
+        # Paso 4: Calcular el hash h del mensaje concatenado con 0x00 y el salt
+        h = hash_message(message, salt, self.params.m, self.params)
+
+        # Pasos 6 a 10: el vinagre y la inversa de LHS ya están calculados
+        entry = self.take()
+        o = entry.solve(h)
+
+        # Paso 14: Calcular s = (v - T o || o); en característica 2 restar es sumar
+        s = np.concatenate((entry.vinegar ^ self.signing_key._T_products.matvec(o), o))
+        entry.vinegar.fill(0)
+
+        # Paso 15: Devolver s y salt
+        return s, salt
+
+    def close(self):
+        """Detiene el rellenado y descarta las prefirmas restantes."""
+        with self._lock:
+            self._closed = True
+            thread = self._refill_thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            self._entries.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,85 @@
+# public_key.py
+import mmap
+import struct
+
+import numpy as np
+
+from .params import parameter_set_for, parameters_of_public_key
+
+# Formato de la clave pública:
+#   cabecera (16 bytes): b"LUOV", versión, r, m, v, nivel de seguridad, relleno
+#   semilla pública (32 bytes)
+#   Q2: m filas de m(m+1)/2 bits, cada una empaquetada (MSB primero) y
+#   rellenada con ceros hasta un múltiplo de 64 bits
+# Con 48 bytes antes de Q2, las filas quedan alineadas a 8 bytes y se pueden
+# ver como palabras uint64 sin copiar.
+MAGIC = b"LUOV"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBHHB5x")
+PUBLIC_SEED_SIZE = 32
+
+
+def serialize_public_key(public_key):
+    """Serializa (public_seed, Q2) con Q2 empaquetado como lo devuelve find_Q2.
+
+    El juego de parámetros se deduce del número de filas de Q2.
+    """
+    public_seed, Q2 = public_key
+    if len(public_seed) != PUBLIC_SEED_SIZE:
+        raise ValueError("La semilla pública debe tener 32 bytes")
+    params = parameters_of_public_key(public_key)
+
+    Q2 = np.asarray(Q2, dtype=np.uint8)
+    rows = np.zeros((params.m, params.Q2_row_bytes), dtype=np.uint8)
+    rows[:, : Q2.shape[1]] = Q2
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, params.r, params.m, params.v, params.security_level
+    )
+    return header + bytes(public_seed) + rows.tobytes()
+
+
+def load_public_key(buffer):
+    """Carga una clave serializada sin copiar Q2.
+
+    buffer puede ser bytes, memoryview o un mmap; Q2 se devuelve como una
+    vista uint8 (m x bytes por fila) sobre él, compatible con verify_signature.
+    Se acepta cualquier juego de parámetros registrado en params.py.
+    """
+    magic, version, key_r, key_m, key_v, _ = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Formato de clave pública no reconocido")
+    params = parameter_set_for(key_r, key_m, key_v)
+    m, row_bytes = params.m, params.Q2_row_bytes
+
+    offset = HEADER.size
+    public_seed = bytes(buffer[offset : offset + PUBLIC_SEED_SIZE])
+    offset += PUBLIC_SEED_SIZE
+    Q2 = np.frombuffer(
+        buffer, dtype=np.uint8, count=m * row_bytes, offset=offset
+    ).reshape(m, row_bytes)
+    return public_seed, Q2
+
+
+def load_public_key_file(path):
+    """Carga una clave pública desde un archivo mapeado en memoria (solo lectura)."""
+    with open(path, "rb") as key_file:
+        mapped = mmap.mmap(key_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return load_public_key(mapped)
+
+
+def Q2_words(Q2):
+    """Vista de Q2 como palabras uint64 por fila, para evaluarlo sin desempaquetar.
+
+    Las claves cargadas con load_public_key ya están alineadas y no se copian;
+    el Q2 de find_Q2 se rellena hasta un múltiplo de 8 bytes por fila.
+    """
+    Q2 = np.asarray(Q2, dtype=np.uint8)
+    row_bytes = parameters_of_public_key((None, Q2)).Q2_row_bytes
+    if Q2.shape[1] != row_bytes or not Q2.flags.c_contiguous:
+        padded = np.zeros((Q2.shape[0], row_bytes), dtype=np.uint8)
+        padded[:, : Q2.shape[1]] = Q2
+        Q2 = padded
+    if Q2.ctypes.data % 8:
+        Q2 = Q2.copy()
+    return Q2.view(np.uint64)
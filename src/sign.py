@@ -1,135 +1,543 @@
-import hashlib
 import numpy as np
 
-from constants import  m, v, r
-from utils import (
-    FindPk1,
-    FindPk2,
+from .constants import r
+from .field import (
+    FIELD_SIZE,
+    INV_TABLE,
+    MUL_TABLE,
+    PackedBitMatrix,
+    bit_matmul,
+    bit_matvec,
+    gf_mul,
+    gf_sum,
+    random_field_vector,
+    unpack_field_elements,
+)
+from .drbg import ShakeDRBG
+from .instrumentation import count, stage, timed
+from .params import DEFAULT_PARAMETERS, SALT_SIZE, parameter_set_for
+from .utils import (
+    FindAllPk1,
+    FindAllPk2,
+    IterPkBlocks,
+    InitializeAndAbsorb,
+    SqueezePublicSeed,
+    SqueezeT,
+    select_shake_function,
     SqueezePublicMap as G,
 )
 
+# Tamaño de los trozos con los que se leen los archivos al hashear
+HASH_CHUNK_SIZE = 1 << 20
+
+# Número de mensajes que se procesan a la vez al construir matrices aumentadas en lote
+BATCH_CHUNK = 16
+
+
+@timed("BuildAugmentedMatrix")
+def BuildAugmentedMatrix(C, L, Q1, T, h, v, params=None):
+    """Construye la matriz aumentada [LHS | RHS] para el hash h y el vinagre v.
 
-def BuildAugmentedMatrix(C, L, Q1, T, h, v):
-    m = C.shape[0]
-    n = L.shape[1]
+    Si params es None el juego de parámetros se deduce de la forma de T (v x m);
+    si se da, T y L deben tener sus tamaños.
+    """
+    if params is None:
+        params = parameter_set_for(r, T.shape[1], T.shape[0])
+    elif T.shape != (params.v, params.m) or L.shape != (params.m, params.n):
+        raise ValueError(f"T y L no corresponden a {params.name}")
     v_len = v.shape[0]
 
-    # Inicializar RHS
-    RHS = h - C - np.dot(L, np.concatenate((v, np.zeros(n - v_len))))
+    # Inicializar RHS = h - C - L (v||0); los coeficientes de C y L están en F_2
+    RHS = h ^ C ^ bit_matvec(L[:, :v_len], v)
 
-    # Inicializar LHS
-    LHS = np.hstack((L, -T))
+    # Inicializar LHS = L (-T ; 1_m), que también es una matriz de bits
+    LHS = bit_matmul(L[:, :v_len], T) ^ L[:, v_len:]
 
-    for k in range(m):
-        Pk1 = FindPk1(k, Q1)
-        Pk2 = FindPk2(k, Q1)
+    # Productos v_i * v_j, compartidos por todas las ecuaciones
+    VV = gf_mul(v[:, None], v[None, :])
 
+    # Q1 puede ser la matriz completa o el generador de filas de SqueezePublicMapStream
+    for k, (Pk1, Pk2) in enumerate(IterPkBlocks(Q1, params)):
         # Actualizar RHS[k]
-        RHS[k] -= np.dot(v.T, np.dot(Pk1, v))
+        RHS[k] ^= gf_sum(Pk1 * VV)
 
         # Calcular Fk,2
-        Fk2 = -(Pk1 + Pk1.T) @ T + Pk2
+        Fk2 = bit_matmul(Pk1 ^ Pk1.T, T) ^ Pk2
 
         # Actualizar LHS[k]
-        LHS[k] += np.dot(v, Fk2)
+        LHS[k] ^= bit_matvec(Fk2.T, v)
 
     # Construir la matriz aumentada
-    A = np.hstack((LHS, RHS[:, np.newaxis]))
+    A = np.hstack((LHS, RHS[:, np.newaxis])).astype(np.uint8)
     return A
 
 
-def GaussianElimination(A):
-    rows, cols = A.shape
+class EliminationWorkspace:
+    """Buffers preasignados para resolver sistemas aumentados de rows x (rows + 1).
+
+    GaussianElimination trabaja en su lugar sobre estos buffers, sin crear
+    arreglos nuevos por pivote. Un workspace no debe compartirse entre hilos.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.system = np.empty((rows, rows + 1), dtype=np.uint8)
+        self.products = np.empty((rows, rows + 1), dtype=np.uint8)
+        self.indices = np.empty((rows, rows + 1), dtype=np.intp)
+        self.pivot_row = np.empty(rows + 1, dtype=np.uint8)
+        self.factors = np.empty(rows, dtype=np.uint8)
+        self.nonzero = np.empty(rows, dtype=bool)
+        self.counts = np.empty(rows, dtype=np.intp)
+
+
+@timed("GaussianElimination")
+def GaussianElimination(A, workspace=None):
+    """Resuelve el sistema aumentado A = [LHS | RHS] sobre F_{2^r}.
+
+    Devuelve None si el sistema es singular. Solo la elección del pivote está
+    enmascarada: se suma a la fila i la primera fila inferior con coeficiente
+    no nulo, solo si A[i, i] = 0, y la singularidad se acumula hasta el final
+    en lugar de cortar el bucle. Normalizar y eliminar sigue indexando
+    INV_TABLE y MUL_TABLE con los coeficientes del sistema, así que el acceso
+    a memoria sí depende de los datos.
+    """
+    rows = A.shape[0]
+    if workspace is None or workspace.rows != rows:
+        workspace = EliminationWorkspace(rows)
+    W = workspace.system
+    products = workspace.products
+    indices = workspace.indices
+    pivot_row = workspace.pivot_row
+    factors = workspace.factors
+    nonzero = workspace.nonzero
+    counts = workspace.counts
+    np.copyto(W, A, casting="unsafe")
+
+    singular = False
     for i in range(rows):
-        # Hacer que el pivote sea 1
-        A[i] = A[i] / A[i, i]
-
-        # Hacer ceros en la columna i
-        for j in range(i + 1, rows):
-            A[j] = A[j] - A[j, i] * A[i]
-
-    # Sustitución hacia atrás
-    x = np.zeros(rows)
-    for i in range(rows - 1, -1, -1):
-        x[i] = A[i, -1] - np.dot(A[i, i + 1 : rows], x[i + 1 : rows])
-
-    return x
-
-
-def hash_message(message, salt, security_level):
-    return hashlib.sha256(salt + message.encode()).digest()[: security_level // 8]
-
-
-def Hash(data, length):
-    # Calcular el hash SHA-256 del dato
-    hash_digest = hashlib.sha256(data).digest()
-
-    # Convertir el hash digest a un vector sobre F_{2^r} de longitud m
-    bit_string = "".join(format(byte, "08b") for byte in hash_digest)
-    bit_vector = [int(bit_string[i : i + r], 2) for i in range(0, length * r, r)]
-
-    return np.array(bit_vector[:length])
-
+        # Elegir la primera fila k > i con W[k, i] != 0 como máscara 0/1
+        np.not_equal(W[:, i], 0, out=nonzero)
+        nonzero[: i + 1] = False
+        np.cumsum(nonzero, out=counts)
+        np.equal(counts, 1, out=factors)
+        np.multiply(factors, nonzero, out=factors)
+
+        # Sumarla a la fila i solo si el pivote actual es cero
+        factors *= W[i, i] == 0
+        np.multiply(W, factors[:, None], out=products)
+        np.bitwise_xor.reduce(products, axis=0, out=pivot_row)
+        W[i] ^= pivot_row
+
+        # Hacer que el pivote sea 1 (si sigue siendo 0 el sistema es singular)
+        singular |= W[i, i] == 0
+        np.take(MUL_TABLE[INV_TABLE[W[i, i]]], W[i], out=pivot_row)
+        W[i] = pivot_row
+
+        # Hacer ceros en la columna i del resto de filas
+        np.copyto(factors, W[:, i])
+        factors[i] = 0
+        np.multiply(factors[:, None], FIELD_SIZE, out=indices, dtype=np.intp)
+        indices += W[i]
+        np.take(MUL_TABLE.ravel(), indices, out=products)
+        W ^= products
+
+    if singular:
+        return None
+
+    # Tras la eliminación de Gauss-Jordan la solución queda en la última columna
+    return W[:, -1].copy()
+
+
+@timed("GaussianElimination")
+def GaussianEliminationBatch(A):
+    """Resuelve en paralelo una pila (N, m, m+1) de sistemas aumentados sobre F_{2^r}.
+
+    Todos los sistemas se eliminan al mismo paso con la misma selección de
+    pivote por máscaras que GaussianElimination. Devuelve (soluciones,
+    resolubles): las soluciones de los sistemas singulares no tienen sentido
+    y se marcan con False en resolubles.
+    """
+    W = np.array(A, dtype=np.uint8)
+    solvable = _eliminate_batch(W)
+    return W[:, :, -1].copy(), solvable
+
+
+@timed("GaussianElimination")
+def InvertMatrixBatch(M):
+    """Invierte una pila (N, m, m) de matrices sobre F_{2^r} por Gauss-Jordan sobre [M | I].
+
+    Devuelve (inversas, invertibles); las inversas de las matrices singulares
+    no tienen sentido y se marcan con False en invertibles.
+    """
+    N, rows, _ = M.shape
+    W = np.zeros((N, rows, 2 * rows), dtype=np.uint8)
+    W[:, :, :rows] = M
+    W[:, np.arange(rows), rows + np.arange(rows)] = 1
+    invertible = _eliminate_batch(W)
+    return W[:, :, rows:].copy(), invertible
+
+
+def _eliminate_batch(W):
+    """Reduce en su lugar una pila (N, rows, cols) a forma escalonada reducida.
+
+    Las primeras rows columnas forman la parte cuadrada; devuelve la máscara
+    de los sistemas en que esa parte es invertible.
+    """
+    N, rows, cols = W.shape
+    solvable = np.ones(N, dtype=bool)
+
+    # Buffers reutilizados en todos los pasos
+    products = np.empty_like(W)
+    indices = np.empty(W.shape, dtype=np.intp)
+    pivot_rows = np.empty((N, cols), dtype=np.uint8)
+    factors = np.empty((N, rows), dtype=np.uint8)
+    nonzero = np.empty((N, rows), dtype=bool)
+    counts = np.empty((N, rows), dtype=np.intp)
 
-def generate_public_seed_and_T(private_seed):
-    # Calcular el número de bytes necesarios para T
-    dm8e = (m + 7) // 8  # Redondear hacia arriba la división de m entre 8
-    length = 32 + v * dm8e
+    for i in range(rows):
+        # Primera fila inferior con coeficiente no nulo en la columna i, para cada sistema
+        np.not_equal(W[:, :, i], 0, out=nonzero)
+        nonzero[:, : i + 1] = False
+        np.cumsum(nonzero, axis=1, out=counts)
+        np.equal(counts, 1, out=factors)
+        np.multiply(factors, nonzero, out=factors)
+
+        # Sumarla a la fila i de los sistemas cuyo pivote actual es cero
+        factors *= (W[:, i, i] == 0)[:, None]
+        np.multiply(W, factors[:, :, None], out=products)
+        np.bitwise_xor.reduce(products, axis=1, out=pivot_rows)
+        W[:, i] ^= pivot_rows
+        solvable &= W[:, i, i] != 0
 
-    # Evaluar H(private_seed, length)
-    hash_output = hashlib.sha256(private_seed).digest()[:length]
+        # Hacer que el pivote sea 1
+        np.multiply(INV_TABLE[W[:, i, i]][:, None], FIELD_SIZE, out=indices[:, 0], dtype=np.intp)
+        indices[:, 0] += W[:, i]
+        np.take(MUL_TABLE.ravel(), indices[:, 0], out=pivot_rows)
+        W[:, i] = pivot_rows
+
+        # Hacer ceros en la columna i del resto de filas
+        np.copyto(factors, W[:, :, i])
+        factors[:, i] = 0
+        np.multiply(factors[:, :, None], FIELD_SIZE, out=indices, dtype=np.intp)
+        indices += W[:, i][:, None, :]
+        np.take(MUL_TABLE.ravel(), indices, out=products)
+        W ^= products
+
+    return solvable
+
+
+def Hash(data, length, params=DEFAULT_PARAMETERS):
+    """Hashea data con SHAKE a un vector de F_{2^r}^length (r bits por elemento, MSB primero)."""
+    return HashBatch([data], length, params)[0]
+
+
+def HashBatch(messages, length, params=DEFAULT_PARAMETERS):
+    """Hashea varios mensajes a la vez; devuelve una matriz (N, length) sobre F_{2^r}."""
+    shake_function = select_shake_function(params.security_level)
+    return squeeze_field_vectors((shake_function(message) for message in messages), length)
+
+
+def squeeze_field_vectors(shakes, length):
+    """Exprime cada contexto SHAKE de shakes a un vector de F_{2^r}^length.
+
+    Es el paso común de HashBatch y hash_messages: se toman ceil(length r / 8)
+    bytes por contexto y se separan en elementos de r bits, MSB primero.
+    Devuelve una matriz (N, length).
+    """
+    digest_size = (length * r + 7) // 8
+    digests = [shake.digest(digest_size) for shake in shakes]
+    digests = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(len(digests), digest_size)
+    return unpack_field_elements(digests, length)
+
+
+def absorb_message(shake, message):
+    """Absorbe message en un contexto SHAKE por partes, sin copiarlo.
+
+    message puede ser un objeto con protocolo de buffer (bytes, bytearray,
+    memoryview, mmap, arreglos de NumPy), un archivo abierto en modo binario
+    o un iterable de trozos de bytes. Los buffers no contiguos se absorben en
+    orden C: los arreglos de NumPy (por ejemplo uno traspuesto) se copian de
+    a bloques de filas de hasta HASH_CHUNK_SIZE bytes y los demás se copian
+    enteros.
+    """
+    try:
+        view = memoryview(message)
+    except TypeError:
+        view = None
+
+    if view is not None and view.c_contiguous:
+        shake.update(view)
+    elif isinstance(message, np.ndarray):
+        rows = max(1, HASH_CHUNK_SIZE // max(1, message[0].nbytes))
+        for start in range(0, message.shape[0], rows):
+            shake.update(np.ascontiguousarray(message[start : start + rows]))
+    elif view is not None:
+        shake.update(view.tobytes())
+    elif hasattr(message, "readinto"):
+        # Un solo buffer reutilizado: memoria constante sin importar el tamaño del archivo
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        chunk = memoryview(buffer)
+        while True:
+            read_size = message.readinto(buffer)
+            if not read_size:
+                break
+            shake.update(chunk[:read_size])
+    elif hasattr(message, "read"):
+        for block in iter(lambda: message.read(HASH_CHUNK_SIZE), b""):
+            shake.update(block)
+    else:
+        for block in message:
+            shake.update(block)
+
+
+def hash_message(message, salt, length, params=DEFAULT_PARAMETERS):
+    """Calcula H(message || 0x00 || salt) en F_{2^r}^length absorbiendo message por partes."""
+    return hash_messages([message], [salt], length, params)[0]
+
+
+def hash_messages(messages, salts, length, params=DEFAULT_PARAMETERS):
+    """Igual que hash_message para varios mensajes; devuelve una matriz (N, length)."""
+    shake_function = select_shake_function(params.security_level)
+
+    shakes = []
+    for message, salt in zip(messages, salts):
+        shake = shake_function()
+        absorb_message(shake, message)
+        shake.update(b"\x00")
+        shake.update(salt)
+        shakes.append(shake)
+
+    return squeeze_field_vectors(shakes, length)
+
+
+def generate_public_seed_and_T(private_seed, params=DEFAULT_PARAMETERS):
+    # Se usa la misma derivación que en generate_keys para que la firma
+    # corresponda a la clave pública publicada
+    private_sponge = InitializeAndAbsorb(private_seed, params)
 
     # Los primeros 32 bytes forman la semilla pública
-    public_seed = hash_output[:32]
+    public_seed = SqueezePublicSeed(private_sponge)
 
-    # Los bytes restantes forman la matriz T
-    T_bytes = hash_output[32:]
-    T = np.zeros((v, m), dtype=int)
-
-    for i in range(v):
-        row_bytes = T_bytes[i * dm8e : (i + 1) * dm8e]
-        row_bits = "".join(format(byte, "08b") for byte in row_bytes)
-        T[i, :] = [int(bit) for bit in row_bits[:m]]
+    # La matriz T (v x m) de bits
+    T = SqueezeT(private_sponge, params)
 
     return public_seed, T
 
 
-def RandomBytes(length):
-    return np.random.bytes(length)
-
-
-def Sign(private_seed, message):
-    # Paso 1: Generar la semilla pública y la matriz T
-    public_seed, T = generate_public_seed_and_T(private_seed)
-
-    # Paso 2: Generar C, L y Q1 a partir de la semilla pública
-    C, L, Q1 = G(public_seed)
-
-    # Paso 3: Generar un salt aleatorio de 16 bytes
-    salt = RandomBytes(16)
-
-    # Paso 4: Calcular el hash h del mensaje concatenado con 0x00 y el salt
-    h = Hash(message + b"\x00" + salt, salt)
-
-    # Paso 5: Bucle hasta encontrar una solución
-    while True:
-        # Paso 6: Generar un vector v aleatorio
-        V = RandomBytes(r * v // 8)
-
-        # Paso 7: Construir la matriz aumentada A
-        A = BuildAugmentedMatrix(C, L, Q1, T, h, V)
-
-        # Paso 9: Aplicar eliminación gaussiana a A
-        solution = GaussianElimination(A)
-
-        # Paso 10: Verificar si el sistema tiene una solución única o
-        if solution is not None:
-            o = solution
-            s0 = np.concatenate((v, o))
-            break
-
-    # Paso 14: Calcular s usando s0 y T
-    s = np.dot(np.hstack((np.eye(v.shape[0]), -T)), s0)
-
-    # Paso 15: Devolver s y salt
-    return s, salt
+class SigningKey:
+    """Contexto de firma precalculado una sola vez a partir de la semilla privada.
+
+    Guarda T, C, L, la parte fija de LHS = L (-T ; 1_m) y los tensores apilados
+    Pk1 (m x v x v), Pk2 y Fk2 (m x v x m), de modo que cada firma solo hace
+    el trabajo que depende del vector de vinagre. params es el juego de
+    parámetros de la clave (por defecto el del nivel configurado).
+
+    Los productos de matrices de bits por el vinagre (L, Fk2 y Pk1, apiladas
+    en una sola matriz) y por la parte de aceite (T) usan PackedBitMatrix.
+
+    Salts y vinagres salen de rng, un ShakeDRBG propio de la clave (sembrado
+    con os.urandom si no se da), así que una misma clave puede firmar desde
+    varios hilos a la vez y dos claves no comparten estado aleatorio.
+    """
+
+    def __init__(self, private_seed, params=DEFAULT_PARAMETERS, rng=None):
+        self.private_seed = private_seed
+        self.params = params
+        self.rng = ShakeDRBG() if rng is None else rng
+        m, v = params.m, params.v
+        self.public_seed, self.T = generate_public_seed_and_T(private_seed, params)
+        self.C, self.L, Q1 = G(self.public_seed, params)
+
+        self.Pk1 = FindAllPk1(Q1, v)
+        self.Pk2 = FindAllPk2(Q1, v, m)
+
+        # Fk2 = -(Pk1 + Pk1^T) T + Pk2 para todas las ecuaciones a la vez
+        self.Fk2 = bit_matmul(self.Pk1 ^ self.Pk1.transpose(0, 2, 1), self.T) ^ self.Pk2
+
+        # Parte de LHS que no depende del vinagre
+        self.LHS = bit_matmul(self.L[:, :v], self.T) ^ self.L[:, v:]
+
+        # Todas las matrices de bits que multiplican al vinagre, una fila por
+        # resultado: L (v||0), las m filas de v^T Fk2 de cada ecuación y Pk1 v
+        vinegar_products = np.concatenate(
+            (
+                self.L[:, :v],
+                self.Fk2.transpose(0, 2, 1).reshape(m * m, v),
+                self.Pk1.reshape(m * v, v),
+            )
+        )
+        self._vinegar_table = PackedBitMatrix.from_bits(vinegar_products).table
+        self._T_table = PackedBitMatrix.from_bits(self.T).table
+        self._attach_products()
+
+    # Arreglos que definen la clave ya expandida (ver from_arrays)
+    ARRAYS = ("T", "C", "L", "Pk1", "Pk2", "Fk2", "LHS", "_vinegar_table", "_T_table")
+
+    def _attach_products(self):
+        m, v = self.params.m, self.params.v
+        self._vinegar_products = PackedBitMatrix(self._vinegar_table, m + m * m + m * v)
+        self._T_products = PackedBitMatrix(self._T_table, v)
+
+    @classmethod
+    def from_arrays(cls, public_seed, arrays, params=DEFAULT_PARAMETERS, rng=None):
+        """Reconstruye una clave a partir de sus arreglos ya expandidos, sin copiarlos.
+
+        arrays es un diccionario con las entradas de ARRAYS (por ejemplo vistas
+        sobre memoria compartida); la semilla privada no es necesaria para firmar.
+        """
+        key = cls.__new__(cls)
+        key.private_seed = None
+        key.params = params
+        key.public_seed = public_seed
+        key.rng = ShakeDRBG() if rng is None else rng
+        for name in cls.ARRAYS:
+            setattr(key, name, arrays[name])
+        key._attach_products()
+        return key
+
+    def build_augmented_matrix(self, h, vinegar):
+        """Equivalente a BuildAugmentedMatrix usando los tensores precalculados."""
+        return self.build_augmented_matrices(h[np.newaxis], vinegar[np.newaxis])[0]
+
+    @timed("BuildAugmentedMatrix")
+    def build_augmented_matrices(self, H, V):
+        """Construye la pila (N, m, m+1) de matrices aumentadas para N hashes y vinagres."""
+        N = H.shape[0]
+        m, v = self.params.m, self.params.v
+        A = np.empty((N, m, m + 1), dtype=np.uint8)
+
+        # Se procesa por bloques para acotar la memoria de las consultas a la tabla
+        for start in range(0, N, BATCH_CHUNK):
+            block = slice(start, min(start + BATCH_CHUNK, N))
+            Vb = V[block]
+
+            # Un solo producto da L (v||0), v^T Fk2 y Pk1 v
+            products = self._vinegar_products.matvec(Vb)
+            Lv = products[:, :m]
+            vFk2 = products[:, m : m + m * m].reshape(-1, m, m)
+            Pk1v = products[:, m + m * m :].reshape(-1, m, v)
+
+            # RHS = h - C - L (v||0) - v^T Pk1 v
+            RHS = H[block] ^ self.C ^ Lv
+            RHS ^= gf_sum(MUL_TABLE[Pk1v, Vb[:, None, :]], axis=-1)
+
+            # LHS = L (-T ; 1_m) + v^T Fk2
+            LHS = self.LHS ^ vFk2
+
+            A[block, :, :m] = LHS
+            A[block, :, m] = RHS
+        return A
+
+    def sign(self, message, attempts=1):
+        """Firma un mensaje; devuelve (s, salt) igual que Sign.
+
+        Con attempts > 1 se prueban varios vectores de vinagre por ronda,
+        resolviendo todos los sistemas a la vez, y se usa el primero resoluble.
+        """
+        m, v = self.params.m, self.params.v
+
+        # Paso 3: Generar un salt aleatorio de 16 bytes
+        salt = self.rng.random_bytes(SALT_SIZE)
+
+        # Paso 4: Calcular el hash h del mensaje concatenado con 0x00 y el salt
+        h = hash_message(message, salt, m, self.params)
+
+        # Paso 5: Bucle hasta encontrar una solución, reutilizando los buffers de eliminación
+        workspace = EliminationWorkspace(m)
+        rounds = 0
+        while True:
+            rounds += 1
+            # Paso 6: Generar vectores de vinagre aleatorios en F_{2^r}^v
+            V = random_field_vector(self.rng.random_bytes(attempts * v), attempts * v)
+            V = V.reshape(attempts, v)
+
+            if attempts == 1:
+                # Paso 7: Construir la matriz aumentada A
+                A = self.build_augmented_matrix(h, V[0])
+
+                # Paso 9: Aplicar eliminación gaussiana a A
+                solution = GaussianElimination(A, workspace)
+                solvable = [solution is not None]
+                solutions = [solution]
+            else:
+                # Pasos 7 y 9 para todos los intentos a la vez
+                A = self.build_augmented_matrices(np.tile(h, (attempts, 1)), V)
+                solutions, solvable = GaussianEliminationBatch(A)
+
+            # Paso 10: Quedarse con el primer sistema con solución única
+            if any(solvable):
+                first = int(np.argmax(solvable))
+                V, o = V[first], solutions[first]
+                break
+
+        count("sign_rounds", rounds)
+        count("sign_retries", rounds - 1)
+
+        # Paso 14: Calcular s = (v - T o || o); en característica 2 restar es sumar
+        s = np.concatenate((V ^ self._T_products.matvec(o), o))
+
+        # Paso 15: Devolver s y salt
+        return s, salt
+
+
+def Sign(private_seed, message, attempts=1, params=DEFAULT_PARAMETERS, rng=None):
+    """Firma message; private_seed puede ser la semilla o un SigningKey ya construido.
+
+    message puede ser bytes, memoryview/mmap, un archivo binario o un iterable
+    de trozos; se hashea por partes sin copiarlo.
+
+    attempts es el número de vectores de vinagre que se prueban en paralelo por ronda.
+    Con un SigningKey se usan su propio juego de parámetros y generador, y
+    params y rng se ignoran.
+    """
+    # Pasos 1 y 2: T, C, L y Q1 se derivan una vez dentro de SigningKey
+    if isinstance(private_seed, SigningKey):
+        signing_key = private_seed
+    else:
+        signing_key = SigningKey(private_seed, params, rng)
+
+    with stage("Sign"):
+        return signing_key.sign(message, attempts)
+
+
+def sign_batch(private_seed, messages, params=DEFAULT_PARAMETERS, rng=None):
+    """Firma varios mensajes en una sola pasada vectorizada.
+
+    Devuelve (S, salts): S es una matriz (N, n) con una firma por fila y salts
+    la lista de salts correspondientes. Solo se reintentan los sistemas singulares.
+    """
+    if isinstance(private_seed, SigningKey):
+        signing_key = private_seed
+    else:
+        signing_key = SigningKey(private_seed, params, rng)
+    m, v = signing_key.params.m, signing_key.params.v
+    rng = signing_key.rng
+
+    N = len(messages)
+    salts = [rng.random_bytes(SALT_SIZE) for _ in range(N)]
+    H = hash_messages(messages, salts, m, signing_key.params)
+
+    S = np.empty((N, v + m), dtype=np.uint8)
+    pending = np.arange(N)
+    rounds = 0
+    while pending.size:
+        # Cada sistema que vuelve a intentarse cuenta como un reintento
+        if rounds:
+            count("sign_retries", pending.size)
+        rounds += 1
+        V = random_field_vector(rng.random_bytes(pending.size * v), pending.size * v)
+        V = V.reshape(pending.size, v)
+
+        A = signing_key.build_augmented_matrices(H[pending], V)
+        O, solvable = GaussianEliminationBatch(A)
+
+        # s = (v - T o || o) para los sistemas resueltos
+        V, O = V[solvable], O[solvable]
+        done = pending[solvable]
+        S[done, :v] = V ^ signing_key._T_products.matvec(O)
+        S[done, v:] = O
+
+        pending = pending[~solvable]
+
+    count("sign_rounds", rounds)
+    return S, salts
@@ -0,0 +1,58 @@
+# signature.py
+import numpy as np
+
+from .field import pack_field_elements, unpack_field_elements
+from .params import DEFAULT_PARAMETERS, SALT_SIZE
+
+# Formato de la firma: los n elementos de s empaquetados a r bits cada uno
+# (MSB primero, rellenando con ceros el último byte) seguidos del salt. Un
+# relleno distinto de cero es inválido, para que cada firma tenga una sola codificación.
+# Los tamaños dependen del juego de parámetros; estos son los del nivel por defecto.
+S_BYTES = DEFAULT_PARAMETERS.s_bytes
+SIGNATURE_SIZE = DEFAULT_PARAMETERS.signature_size
+
+
+def encode_signatures(S, salts, params=DEFAULT_PARAMETERS):
+    """Codifica una pila (N, n) de firmas con sus salts en una matriz (N, signature_size)."""
+    S = np.asarray(S, dtype=np.uint8)
+    N = S.shape[0]
+    encoded = np.empty((N, params.signature_size), dtype=np.uint8)
+
+    encoded[:, : params.s_bytes] = pack_field_elements(S)
+    encoded[:, params.s_bytes :] = np.frombuffer(b"".join(salts), dtype=np.uint8).reshape(
+        N, SALT_SIZE
+    )
+    return encoded
+
+
+def canonical_signatures(signatures, params=DEFAULT_PARAMETERS):
+    """Indica, por fila de una matriz (N, signature_size), si los bits de relleno de s son cero."""
+    signatures = np.asarray(signatures, dtype=np.uint8)
+    padding_mask = (1 << (8 * params.s_bytes - params.n * params.r)) - 1
+    return signatures[:, params.s_bytes - 1] & padding_mask == 0
+
+
+def decode_signatures(signatures, params=DEFAULT_PARAMETERS):
+    """Decodifica una matriz (N, signature_size) de firmas; devuelve (S, salts).
+
+    Lanza ValueError si alguna firma tiene bits de relleno distintos de cero.
+    """
+    signatures = np.asarray(signatures, dtype=np.uint8)
+    if not np.all(canonical_signatures(signatures, params)):
+        raise ValueError("La firma tiene bits de relleno distintos de cero")
+    S = unpack_field_elements(signatures[:, : params.s_bytes], params.n)
+    salts = [row.tobytes() for row in signatures[:, params.s_bytes :]]
+    return S, salts
+
+
+def encode_signature(s, salt, params=DEFAULT_PARAMETERS):
+    """Codifica una firma (s, salt) en signature_size bytes."""
+    return encode_signatures(np.asarray(s)[np.newaxis], [salt], params)[0].tobytes()
+
+
+def decode_signature(signature, params=DEFAULT_PARAMETERS):
+    """Decodifica signature_size bytes en (s, salt)."""
+    if len(signature) != params.signature_size:
+        raise ValueError(f"La firma debe tener {params.signature_size} bytes")
+    S, salts = decode_signatures(np.frombuffer(signature, dtype=np.uint8)[np.newaxis], params)
+    return S[0], salts[0]
@@ -3,50 +3,109 @@
 import hashlib
 import os
 import sys
+from functools import lru_cache
+
 import numpy as np
 
-from constants import SECURITY_LEVEL, m, v, n, SEED_SIZE
+from .constants import SEED_SIZE
+from .field import PackedBitMatrix
+from .instrumentation import count, timed
+from .params import DEFAULT_PARAMETERS
+
 
+def InitializeAndAbsorb(private_seed, params=DEFAULT_PARAMETERS):
+    """Absorbe la semilla privada y exprime la salida de SHAKE de la que salen la semilla pública y T.
 
-def InitializeAndAbsorb(private_seed):
-    """Inicializa y absorbe la semilla privada para generar el estado del SHAKE128."""
-    shake_function = select_shake_function(SECURITY_LEVEL)
-    return shake_function(private_seed).digest(SEED_SIZE)
+    Los primeros SEED_SIZE bytes son la semilla pública y los v * ceil(m / 8)
+    siguientes son las filas de T, como en la especificación. T no puede
+    derivarse de la semilla pública porque sale de bytes que no se publican.
+    """
+    shake_function = select_shake_function(params.security_level)
+    return shake_function(private_seed).digest(SEED_SIZE + params.v * params.T_row_bytes)
 
 
 def SqueezePublicSeed(private_sponge):
-    """Extrae la semilla pública del estado del SHAKE128."""
-    public_seed = private_sponge[:32]
-    print(len(public_seed))
+    """Extrae la semilla pública de la salida de SHAKE(semilla privada)."""
+    public_seed = private_sponge[:SEED_SIZE]
     return public_seed
 
 
+@lru_cache(maxsize=None)
+def Pk_column_maps(v, m):
+    """Precalcula, para un juego de parámetros, las columnas de Q1 de cada Pk1 y Pk2.
+
+    Cada fila i de vinagre ocupa en Q1 v - i columnas de Pk1 seguidas de m
+    columnas de Pk2. Devuelve (filas, columnas, columnas_Q1) del triángulo
+    superior de Pk1 y la matriz (v x m) de columnas de Q1 de Pk2.
+    """
+    rows, cols = np.triu_indices(v)
+    row_start = np.arange(v) * (v + m) - (np.arange(v) * (np.arange(v) - 1)) // 2
+    Pk1_columns = row_start[rows] + (cols - rows)
+    Pk2_columns = (row_start + v - np.arange(v))[:, None] + np.arange(m)[None, :]
+    for array in (rows, cols, Pk1_columns, Pk2_columns):
+        array.flags.writeable = False
+    return rows, cols, Pk1_columns, Pk2_columns
+
+
+def _oil_count(Q1, v):
+    """Deduce m a partir del número de columnas de Q1 (v (v + 1) / 2 + v m)."""
+    m, remainder = divmod(Q1.shape[-1] - (v * (v + 1)) // 2, v)
+    if m <= 0 or remainder:
+        raise ValueError(f"Q1 con {Q1.shape[-1]} columnas no corresponde a v = {v}")
+    return m
+
+
+def _check_oil_count(Q1, v, m):
+    if _oil_count(Q1, v) != m:
+        raise ValueError(f"Q1 con {Q1.shape[-1]} columnas no corresponde a v = {v}, m = {m}")
+
+
+@timed("FindPk")
 def FindPk1(Q1, k, v):
     """Extrae la submatriz Pk1 de Q1, que representa los términos cuadráticos en variables de vinagre."""
-    Pk1 = np.zeros((v, v), dtype=int)
-    column = 1  # El primer término cuadrático empieza en la columna 0 de Q1
-    # Recorremos la mitad superior de la matriz cuadrada de vinagre
-    for i in range(1,v):
-        for j in range(i, v):
-            Pk1[i, j] = Q1[k, column]
-            # Pk1[j, i] = Pk1[i, j]  # Simetría de los términos cuadráticos
-            column += 1
-        column += m
+    rows, cols, Pk1_columns, _ = Pk_column_maps(v, _oil_count(Q1, v))
+    Pk1 = np.zeros((v, v), dtype=np.uint8)
+    # Solo se llena la mitad superior de la matriz cuadrada de vinagre
+    Pk1[rows, cols] = Q1[k, Pk1_columns]
     return Pk1
 
 
+@timed("FindPk")
 def FindPk2(Q1, k, v, m):
     """Extrae la submatriz Pk2 de Q1, que representa los términos bilineales entre vinagre y aceite."""
-    Pk2 = np.zeros((v, m), dtype=int)
-    column = 1  # Empieza después de los términos cuadráticos en vinagre
+    _check_oil_count(Q1, v, m)
+    _, _, _, Pk2_columns = Pk_column_maps(v, m)
+    return Q1[k, Pk2_columns]
+
+
+@timed("FindPk")
+def FindAllPk1(Q1, v):
+    """Extrae Pk1 para todas las ecuaciones a la vez como un tensor (m x v x v)."""
+    rows, cols, Pk1_columns, _ = Pk_column_maps(v, _oil_count(Q1, v))
+    Pk1 = np.zeros((Q1.shape[0], v, v), dtype=np.uint8)
+    Pk1[:, rows, cols] = Q1[:, Pk1_columns]
+    return Pk1
+
+
+@timed("FindPk")
+def FindAllPk2(Q1, v, m):
+    """Extrae Pk2 para todas las ecuaciones a la vez como un tensor (m x v x m)."""
+    _check_oil_count(Q1, v, m)
+    _, _, _, Pk2_columns = Pk_column_maps(v, m)
+    return Q1[:, Pk2_columns]
+
 
-    # Recorremos los términos bilineales
-    for i in range(1,v):
-        column += v-i+1
-        for j in range(1,m):
-            Pk2[i, j] = Q1[k, column]
-            column += 1
-    return Pk2
+def pack_public_map(L, Q1, v):
+    """Prepara L y Q1 para evaluar P(s) con PackedBitMatrix.
+
+    Cada ecuación k se reescribe como s^T B_k s, donde la fila i de B_k
+    (v x n) junta las filas i de Pk1 y Pk2; así la parte de Q1 es
+    sum_i s_i (B_k s)_i y todos los B_k s salen de un solo producto de una
+    matriz de bits. Las primeras m filas de la matriz apilada son L.
+    """
+    m = _oil_count(Q1, v)
+    B = np.concatenate((FindAllPk1(Q1, v), FindAllPk2(Q1, v, m)), axis=2)
+    return PackedBitMatrix.from_bits(np.concatenate((L, B.reshape(m * v, -1))))
 
 
 def flatten_upper_triangular(matrix):
@@ -68,49 +127,107 @@ def select_shake_function(security_level):
         raise ValueError("Nivel de seguridad no soportado")
 
 
-def SqueezeT(private_sponge):
-    """Genera la matriz T (v x m) a partir de la semilla privada."""
-    shake_function = select_shake_function(SECURITY_LEVEL)
-    num_bits = v * m
-    num_bytes = (
-        num_bits + 7
-    ) // 8  # Redondear hacia arriba para obtener el número de bytes necesarios
-    shake_output = shake_function(private_sponge).digest(num_bytes)
-    T_bits = squeeze_bits_from_shake(shake_output, num_bits)
-    return np.array(T_bits).reshape(v, m)
+def SqueezeT(private_sponge, params=DEFAULT_PARAMETERS):
+    """Genera la matriz T (v x m) a partir de la salida de InitializeAndAbsorb.
+
+    Cada fila de T son los primeros m bits (MSB primero) de su bloque de
+    ceil(m / 8) bytes, a continuación de la semilla pública.
+    """
+    num_bytes = params.v * params.T_row_bytes
+    T_bytes = private_sponge[SEED_SIZE : SEED_SIZE + num_bytes]
+    if len(T_bytes) != num_bytes:
+        raise ValueError("La salida de SHAKE no alcanza para la matriz T")
+    count("bytes_squeezed", num_bytes)
+    rows = np.frombuffer(T_bytes, dtype=np.uint8).reshape(params.v, params.T_row_bytes)
+    return np.unpackbits(rows, axis=1, count=params.m)
 
 
 def squeeze_bits_from_shake(shake_output, num_bits):
-    """Convert SHAKE output into a list of bits."""
-    bits = []
-    for byte in shake_output:
-        bits.extend([int(bit) for bit in format(byte, "08b")])
-    return bits[:num_bits]
+    """Convierte la salida de SHAKE en un arreglo uint8 de bits (MSB primero)."""
+    packed = np.frombuffer(shake_output, dtype=np.uint8)
+    return np.unpackbits(packed, count=num_bits)
+
+
+def squeeze_packed_bits_from_shake(shake_output, num_bits):
+    """Devuelve los primeros num_bits de la salida de SHAKE empaquetados, 8 por byte.
 
+    Es una vista de solo lectura sobre shake_output (sin copias); los bits
+    sobrantes del último byte no se limpian.
+    """
+    return np.frombuffer(shake_output, dtype=np.uint8, count=(num_bits + 7) // 8)
 
-def SqueezePublicMap(public_seed):
+
+@timed("SqueezePublicMap")
+def SqueezePublicMap(public_seed, params=DEFAULT_PARAMETERS):
     """Genera las matrices C, L, y Q1 a partir de la semilla pública usando SHAKE128."""
     # C necesita m bits, L necesita m * n bits, y Q1 necesita m * (v * (v + 1) // 2 + v * m) bits
+    m, n = params.m, params.n
     C_bits_needed = m
     L_bits_needed = m * n
-    Q1_bits_needed = m * (((v * (v + 1)) // 2) + v * m)
-
-    total_bits_needed = C_bits_needed + L_bits_needed + Q1_bits_needed
+    total_bits_needed = params.public_map_bits
 
     # Aquí generamos la cantidad correcta de bits, dividiendo entre 8 para convertir bits a bytes
-    shake_function = select_shake_function(SECURITY_LEVEL)
+    shake_function = select_shake_function(params.security_level)
     shake_output = shake_function(public_seed).digest((total_bits_needed + 7) // 8)
+    count("bytes_squeezed", len(shake_output))
 
     bits = squeeze_bits_from_shake(shake_output, total_bits_needed)
 
-    # Separar los bits en las matrices correspondientes
-    C_bits = bits[:C_bits_needed]
-    L_bits = bits[C_bits_needed : C_bits_needed + L_bits_needed]
-    Q1_bits = bits[C_bits_needed + L_bits_needed :]
-
-    # Convertir a matrices
-    C = np.array(C_bits)
-    L = np.array(L_bits).reshape(m, n)
-    Q1 = np.array(Q1_bits).reshape(m, (v * (v + 1)) // 2 + v * m)
+    # Separar los bits en las matrices correspondientes (vistas, sin copias)
+    C = bits[:C_bits_needed]
+    L = bits[C_bits_needed : C_bits_needed + L_bits_needed].reshape(m, n)
+    Q1 = bits[C_bits_needed + L_bits_needed :].reshape(m, params.Q1_columns)
 
     return C, L, Q1
+
+
+@timed("SqueezePublicMap")
+def SqueezePublicMapStream(public_seed, params=DEFAULT_PARAMETERS):
+    """Genera C y L, y un generador que entrega las filas de Q1 una por una.
+
+    La salida de SHAKE se guarda empaquetada (8 bits por byte) y cada fila de
+    Q1 se desempaqueta solo cuando se pide, así que la memoria usada no depende
+    de cuántas filas se consuman y se puede dejar de iterar en cualquier momento.
+    """
+    m, n, Q1_columns = params.m, params.n, params.Q1_columns
+    C_bits_needed = m
+    L_bits_needed = m * n
+    total_bits_needed = params.public_map_bits
+
+    # hashlib no permite exprimir SHAKE de forma incremental, así que se
+    # extrae todo de una vez, pero sin expandir a un byte por bit
+    shake_function = select_shake_function(params.security_level)
+    shake_output = shake_function(public_seed).digest((total_bits_needed + 7) // 8)
+    count("bytes_squeezed", len(shake_output))
+    packed = squeeze_packed_bits_from_shake(shake_output, total_bits_needed)
+
+    bits = np.unpackbits(packed, count=C_bits_needed + L_bits_needed)
+    C = bits[:C_bits_needed]
+    L = bits[C_bits_needed:].reshape(m, n)
+
+    def rows():
+        start = C_bits_needed + L_bits_needed
+        for k in range(m):
+            first_byte, offset = divmod(start, 8)
+            last_byte = (start + Q1_columns + 7) // 8
+            row_bits = np.unpackbits(packed[first_byte:last_byte])
+            yield row_bits[offset : offset + Q1_columns]
+            start += Q1_columns
+
+    return C, L, rows()
+
+
+def IterPkBlocks(Q1_rows, params=DEFAULT_PARAMETERS):
+    """Genera los pares (Pk1, Pk2) a partir de las filas de Q1, en orden de k.
+
+    Q1_rows puede ser la matriz Q1 completa o el generador de
+    SqueezePublicMapStream. Cada fila debe tener las columnas de Q1 de params.
+    """
+    v = params.v
+    rows, cols, Pk1_columns, Pk2_columns = Pk_column_maps(v, params.m)
+    for Q1_row in Q1_rows:
+        if Q1_row.shape[-1] != params.Q1_columns:
+            raise ValueError(f"Las filas de Q1 no corresponden a {params.name}")
+        Pk1 = np.zeros((v, v), dtype=np.uint8)
+        Pk1[rows, cols] = Q1_row[Pk1_columns]
+        yield Pk1, Q1_row[Pk2_columns]
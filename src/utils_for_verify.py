@@ -1,49 +1,177 @@
 # utils_for_verify.py
+from functools import lru_cache
 
- def verify_signature(public_key, message, signature):
-     public_seed, Q2 = public_key
-     private_sponge = InitializeAndAbsorb(public_seed)
+import numpy as np
 
-     C, L, Q1 = G(public_seed)
+from .cache import public_map_cache
+from .field import MUL_TABLE, bit_matvec, gf_mul, gf_sum, pack_bit_rows, packed_bit_matvec
+from .keystore import KeyHandle
+from .params import parameters_of_public_key
+from .public_key import Q2_words
+from .sign import BATCH_CHUNK, hash_message, hash_messages
+from .signature import canonical_signatures, decode_signature, decode_signatures
+from .utils import SqueezePublicMap as G, SqueezePublicMapStream, pack_public_map
 
-     salt = signature[-16:]
-     h = hash_message(message, salt, SECURITY_LEVEL)
 
-     V = signature[:-16]
-     V = np.frombuffer(V, dtype=np.uint8)  # Convertir bytes a array de NumPy
-     V = np.unpackbits(V)  # Desempaquetar bits para obtener un array de bits
-     expected_length = (v * (v + 1)) // 2 + v * m
-     V = V[:expected_length]
+def verify_signature(public_key, message, signature, cache=public_map_cache, params=None):
+    """Verifica la firma; con cache=None la expansión pública se hace en streaming.
 
-     A = BuildAugmentedMatrix(C, L, Q1, None, h, V)
-     solution = GaussianElimination(A)
+    public_key puede ser la tupla (public_seed, Q2) o un KeyHandle de un KeyStore;
+    message acepta los mismos tipos que Sign (bytes, mmap, archivo o trozos).
+    Si params es None el juego de parámetros se deduce de la forma de Q2.
+    """
+    if isinstance(public_key, KeyHandle):
+        public_key = public_key.public_key
+    public_seed, Q2 = public_key
+    if params is None:
+        params = parameters_of_public_key(public_key)
 
-     # Verificar si la solución es válida
-     if np.allclose(np.dot(A[:, :-1], solution), A[:, -1]):
-         return True
-     else:
-         return False
+    # La firma es s empaquetado a r bits por elemento seguido del salt; un
+    # largo incorrecto o un relleno no nulo la hacen inválida
+    if len(signature) != params.signature_size:
+        return False
+    if not canonical_signatures(np.frombuffer(signature, dtype=np.uint8)[np.newaxis], params)[0]:
+        return False
+    s, salt = decode_signature(signature, params)
 
+    h = hash_message(message, salt, params.m, params)
 
- def EvaluatePublicMap(public_seed, Q2, s):
-     # Paso 1: Generar C, L y Q1 a partir de la semilla pública
-     C, L, Q1 = G(public_seed)
+    # Las expansiones de claves ya vistas salen de la caché sin volver a usar SHAKE
+    if cache is not None:
+        C, packed = cache.get_packed(public_seed, params)
+        return bool(np.array_equal(EvaluatePublicMapPacked(C, packed, Q2, s), h))
 
-     # Paso 2: Concatenar Q1 y Q2 para formar Q
-     Q = np.hstack((Q1, Q2))
+    # Sin caché Q1 no se guarda completo: se expande y evalúa fila por fila
+    C, L, Q1_rows = SqueezePublicMapStream(public_seed, params)
 
-     # Paso 3: Inicializar e con C y agregar la parte lineal Ls
-     e = C + np.dot(L, s)
+    # Verificar que P(s) = h ecuación por ecuación, deteniéndose en la primera diferencia
+    for e_k, h_k in zip(EvaluatePublicMapRows(C, L, Q1_rows, Q2, s), h):
+        if e_k != h_k:
+            return False
+    return True
 
-     # Paso 4: Inicializar la columna
-     column = 0
 
-     # Paso 5: Iterar sobre los índices i y j para evaluar las partes cuadráticas de P en s
-     for i in range(len(s)):
-         for j in range(i, len(s)):
-             for k in range(len(C)):
-                 e[k] += Q[k, column] * s[i] * s[j]
-             column += 1
+def verify_batch(public_key, items, cache=public_map_cache, params=None):
+    """Verifica muchos pares (message, signature) contra una misma clave pública.
 
-     # Paso 6: Devolver e
-     return e
+    Devuelve un arreglo booleano con una entrada por par.
+    """
+    if isinstance(public_key, KeyHandle):
+        public_key = public_key.public_key
+    public_seed, Q2 = public_key
+    if params is None:
+        params = parameters_of_public_key(public_key)
+    signature_size = params.signature_size
+    items = list(items)
+    valid = np.zeros(len(items), dtype=bool)
+
+    # Las firmas de largo incorrecto o con relleno no nulo quedan como
+    # inválidas; el resto se decodifica junto
+    indices = [
+        index for index, (_, signature) in enumerate(items) if len(signature) == signature_size
+    ]
+    encoded = np.frombuffer(
+        b"".join(bytes(items[index][1]) for index in indices), dtype=np.uint8
+    ).reshape(len(indices), signature_size)
+    canonical = canonical_signatures(encoded, params)
+    indices = [index for index, keep in zip(indices, canonical) if keep]
+    encoded = encoded[canonical]
+    if not indices:
+        return valid
+
+    S, salts = decode_signatures(encoded, params)
+    H = hash_messages([items[index][0] for index in indices], salts, params.m, params)
+
+    if cache is not None:
+        C, packed = cache.get_packed(public_seed, params)
+    else:
+        C, L, Q1 = G(public_seed, params)
+        packed = pack_public_map(L, Q1, params.v)
+
+    E = np.empty((S.shape[0], params.m), dtype=np.uint8)
+    for start in range(0, S.shape[0], BATCH_CHUNK):
+        block = slice(start, start + BATCH_CHUNK)
+        E[block] = EvaluatePublicMapPacked(C, packed, Q2, S[block])
+    valid[indices] = np.all(E == H, axis=1)
+    return valid
+
+
+@lru_cache(maxsize=None)
+def upper_triangular_indices(size):
+    """Índices (i, j) con i <= j en el orden de las columnas de Q1 || Q2."""
+    i, j = np.triu_indices(size)
+    i.flags.writeable = False
+    j.flags.writeable = False
+    return i, j
+
+
+def quadratic_monomials(s):
+    """Vector de monomios s_i * s_j (i <= j) sobre F_{2^r}."""
+    i, j = upper_triangular_indices(s.shape[-1])
+    return gf_mul(s[..., i], s[..., j])
+
+
+def EvaluatePublicMap(public_seed, Q2, s, packed=False, params=None):
+    """Evalúa P(s) = C + L s + Q (s_i s_j)_{i<=j} para todas las ecuaciones.
+
+    Q2 se evalúa siempre sobre sus palabras empaquetadas de 64 bits (AND y
+    conteo de bits); con packed=True Q1 también se empaqueta así.
+    """
+    if params is None:
+        params = parameters_of_public_key((public_seed, Q2))
+
+    # Paso 1: Generar C, L y Q1 a partir de la semilla pública
+    C, L, Q1 = G(public_seed, params)
+
+    # Paso 2: Inicializar e con C y agregar la parte lineal Ls
+    e = C ^ bit_matvec(L, s)
+
+    # Paso 3: Agregar la parte cuadrática de Q1 sobre los monomios s_i * s_j
+    monomials = quadratic_monomials(s)
+    Q1_columns = Q1.shape[1]
+    if packed:
+        e ^= packed_bit_matvec(pack_bit_rows(Q1), monomials[:Q1_columns])
+    else:
+        e ^= bit_matvec(Q1, monomials[:Q1_columns])
+
+    # Paso 4: Agregar la parte de Q2 directamente sobre sus palabras empaquetadas
+    e ^= packed_bit_matvec(Q2_words(Q2), monomials[Q1_columns:])
+
+    # Paso 5: Devolver e
+    return e
+
+
+def EvaluatePublicMapRows(C, L, Q1_rows, Q2, s):
+    """Evalúa P(s) ecuación por ecuación a partir de un iterable de filas de Q1."""
+    # Monomios s_i * s_j con i <= j, en el mismo orden que las columnas de Q1 || Q2
+    monomials = quadratic_monomials(s)
+    m = Q2.shape[0]
+    Q1_columns = monomials.shape[0] - (m * (m + 1)) // 2
+
+    # Las partes lineal y de Q2 son pequeñas y se calculan para todas las ecuaciones
+    fixed = C ^ bit_matvec(L, s) ^ packed_bit_matvec(Q2_words(Q2), monomials[Q1_columns:])
+
+    for k, Q1_row in enumerate(Q1_rows):
+        yield fixed[k] ^ gf_sum(Q1_row * monomials[:Q1_columns])
+
+
+def EvaluatePublicMapPacked(C, packed, Q2, s):
+    """Evalúa P(s) con L y Q1 preparados por pack_public_map.
+
+    Un solo producto de la matriz de bits da L s y los vectores B_k s; la
+    parte de Q1 es entonces un producto punto de cada B_k s con el vinagre.
+    s puede tener ejes iniciales (una pila de firmas).
+    """
+    m = Q2.shape[0]
+    v = s.shape[-1] - m
+
+    # Paso 1: L s y B_k s para todas las ecuaciones
+    products = packed.matvec(s)
+    Bs = products[..., m:].reshape(s.shape[:-1] + (m, v))
+
+    # Paso 2: Agregar C, L s y la parte de Q1: sum_i s_i (B_k s)_i
+    e = C ^ products[..., :m] ^ gf_sum(MUL_TABLE[Bs, s[..., None, :v]], axis=-1)
+
+    # Paso 3: Agregar la parte de Q2 sobre los monomios de aceite
+    e ^= packed_bit_matvec(Q2_words(Q2), quadratic_monomials(s[..., v:]))
+    return e
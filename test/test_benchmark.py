@@ -0,0 +1,38 @@
+import json
+import unittest
+from src.benchmark import benchmark_seed, run_benchmarks
+from src.params import get_parameter_set
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_report_is_json_with_all_stages(self):
+        report = run_benchmarks(levels=[1], batch_sizes=[2], repeat=2)
+        report = json.loads(json.dumps(report))
+
+        result = report["results"][0]
+        self.assertEqual(result["parameters"], "LUOV-7-57-197")
+        for stage in (
+            "SqueezePublicMap",
+            "find_Q2",
+            "generate_keys",
+            "BuildAugmentedMatrix",
+            "GaussianElimination",
+            "Sign",
+            "verify_signature",
+            "end_to_end",
+        ):
+            stats = result["stages"][stage]
+            self.assertGreater(stats["ops_per_s"], 0)
+            self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+            self.assertGreaterEqual(stats["peak_memory_kb"], 0)
+        self.assertEqual(result["batches"]["2"]["sign_batch"]["batch_size"], 2)
+
+    def test_seeds_are_fixed(self):
+        level_1, level_3 = get_parameter_set(1), get_parameter_set(3)
+        self.assertEqual(benchmark_seed(0, level_1), benchmark_seed(0, level_1))
+        self.assertNotEqual(benchmark_seed(0, level_1), benchmark_seed(0, level_3))
+
+
+if __name__ == "__main__":
+    unittest.main()
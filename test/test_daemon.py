@@ -0,0 +1,114 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from src.daemon import (
+    OP_VERIFY,
+    REQUEST_HEADER,
+    RESPONSE_HEADER,
+    STATUS_ERROR,
+    DaemonBusy,
+    DaemonClient,
+    DaemonError,
+    SigningDaemon,
+)
+from src.keygen import generate_private_seed, generate_keys
+from src.signature import decode_signature
+from src.utils_for_verify import verify_signature
+
+
+class TestSigningDaemon(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_seed = generate_private_seed()
+        cls.public_key, _, _ = generate_keys(cls.private_seed)
+
+    def run_with_daemon(self, scenario, **options):
+        async def main():
+            daemon = SigningDaemon(
+                signing_keys={"firma": self.private_seed},
+                public_keys={"firma": self.public_key},
+                **options,
+            )
+            with tempfile.TemporaryDirectory() as directory:
+                path = self.path = os.path.join(directory, "luov.sock")
+                await daemon.start(path)
+                try:
+                    client = await DaemonClient.connect(path)
+                    async with client:
+                        return await scenario(daemon, client)
+                finally:
+                    await daemon.close()
+
+        return asyncio.run(main())
+
+    def test_sign_and_verify_concurrently(self):
+        messages = [f"Mensaje {index} al demonio".encode() for index in range(24)]
+
+        async def scenario(daemon, client):
+            signatures = await asyncio.gather(*(client.sign("firma", message) for message in messages))
+            valid = await asyncio.gather(
+                *(client.verify("firma", message, signature) for message, signature in zip(messages, signatures))
+            )
+            forged = await client.verify("firma", b"Otro mensaje", signatures[0])
+            return signatures, valid, forged, await client.metrics()
+
+        signatures, valid, forged, metrics = self.run_with_daemon(scenario, max_batch=8)
+        self.assertTrue(all(valid))
+        self.assertFalse(forged)
+        for message, signature in zip(messages, signatures):
+            decode_signature(signature)
+            self.assertTrue(verify_signature(self.public_key, message, signature))
+
+        self.assertEqual(metrics["signed"], 24)
+        self.assertEqual(metrics["verified"], 25)
+        self.assertEqual(metrics["queue_depth"], 0)
+        # Las peticiones concurrentes se agrupan en lotes de como mucho max_batch
+        self.assertLess(metrics["batches"], 49)
+        self.assertLessEqual(metrics["max_batch_size"], 8)
+
+    def test_unknown_key(self):
+        async def scenario(daemon, client):
+            with self.assertRaises(DaemonError):
+                await client.sign("no-existe", b"Mensaje")
+            return (await client.metrics())["errors"]
+
+        self.assertEqual(self.run_with_daemon(scenario), 1)
+
+    def test_backpressure(self):
+        async def scenario(daemon, client):
+            results = await asyncio.gather(
+                *(client.sign("firma", b"Mensaje %d" % index) for index in range(8)),
+                return_exceptions=True,
+            )
+            return results, await client.metrics()
+
+        results, metrics = self.run_with_daemon(scenario, max_queue=2)
+        rejected = [result for result in results if isinstance(result, DaemonBusy)]
+        self.assertGreater(len(rejected), 0)
+        self.assertEqual(metrics["rejected"], len(rejected))
+        self.assertEqual(metrics["signed"], 8 - len(rejected))
+
+    def test_oversized_request_is_rejected(self):
+        async def scenario(daemon, client):
+            reader, writer = await asyncio.open_unix_connection(self.path)
+            # Solo se envía la cabecera: el demonio no debe esperar los 4 GiB anunciados
+            writer.write(REQUEST_HEADER.pack(OP_VERIFY, 7, 5, 10, 0xFFFFFFFF))
+            await writer.drain()
+            header = await reader.readexactly(RESPONSE_HEADER.size)
+            request_id, status, size = RESPONSE_HEADER.unpack(header)
+            await reader.readexactly(size)
+            closed = await reader.read() == b""
+            writer.close()
+            # La conexión del cliente normal sigue funcionando
+            return request_id, status, closed, await client.verify("firma", b"Mensaje", b"")
+
+        request_id, status, closed, valid = self.run_with_daemon(scenario)
+        self.assertEqual((request_id, status), (7, STATUS_ERROR))
+        self.assertTrue(closed)
+        self.assertFalse(valid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.drbg import ShakeDRBG
+from src.keygen import generate_private_seed, generate_keys
+from src.sign import Sign, SigningKey
+from src.signature import encode_signature
+from src.utils_for_verify import verify_signature
+
+
+class TestShakeDRBG(unittest.TestCase):
+
+    def test_seeded_output_is_reproducible(self):
+        first, second = ShakeDRBG(b"semilla"), ShakeDRBG(b"semilla")
+        self.assertEqual(first.random_bytes(64), second.random_bytes(64))
+        self.assertEqual(first.random_bytes(16), second.random_bytes(16))
+        self.assertNotEqual(ShakeDRBG(b"semilla").random_bytes(32), ShakeDRBG(b"otra").random_bytes(32))
+        # La semilla y la personalización no se pueden intercambiar bytes entre sí
+        self.assertNotEqual(ShakeDRBG(b"ab", b"c").random_bytes(32), ShakeDRBG(b"a", b"bc").random_bytes(32))
+
+    def test_outputs_do_not_repeat(self):
+        rng = ShakeDRBG(b"semilla")
+        self.assertNotEqual(rng.random_bytes(32), rng.random_bytes(32))
+        before = ShakeDRBG(b"semilla")
+        before.reseed(b"entropia")
+        self.assertNotEqual(before.random_bytes(32), ShakeDRBG(b"semilla").random_bytes(32))
+
+    def test_concurrent_requests_are_distinct(self):
+        rng = ShakeDRBG()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(lambda _: rng.random_bytes(32), range(256)))
+        self.assertEqual(len(set(outputs)), 256)
+
+
+class TestThreadSafeSigning(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_seed = generate_private_seed()
+        cls.public_key, _, _ = generate_keys(cls.private_seed)
+
+    def test_signing_is_reproducible_with_seeded_rng(self):
+        message = b"Firma reproducible"
+        first = Sign(self.private_seed, message, rng=ShakeDRBG(b"fija"))
+        second = Sign(self.private_seed, message, rng=ShakeDRBG(b"fija"))
+        np.testing.assert_array_equal(first[0], second[0])
+        self.assertEqual(first[1], second[1])
+
+    def test_sign_and_verify_from_threads(self):
+        signing_key = SigningKey(self.private_seed)
+        messages = [f"Mensaje concurrente {index}".encode() for index in range(16)]
+
+        def sign_and_verify(message):
+            s, salt = Sign(signing_key, message)
+            return salt, verify_signature(self.public_key, message, encode_signature(s, salt))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(sign_and_verify, messages))
+
+        self.assertTrue(all(valid for _, valid in results))
+        self.assertEqual(len({salt for salt, _ in results}), len(messages))
+
+
+if __name__ == "__main__":
+    unittest.main()
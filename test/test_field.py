@@ -0,0 +1,84 @@
+import unittest
+import numpy as np
+from src.field import (
+    FIELD_SIZE,
+    MUL_TABLE,
+    PackedBitMatrix,
+    gf_add,
+    gf_mul,
+    gf_inv,
+    gf_div,
+    gf_matmul,
+    bit_matvec,
+    bit_matmul,
+    pack_bit_rows,
+    packed_bit_matvec,
+)
+
+
+def slow_mul(a, b):
+    """Multiplicación de referencia en F_2[x] / (x^7 + x + 1)."""
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        b >>= 1
+        a <<= 1
+        if a & 0x80:
+            a ^= 0x83
+    return result
+
+
+class TestField(unittest.TestCase):
+
+    def test_mul_table_matches_reference(self):
+        for a in range(FIELD_SIZE):
+            for b in range(FIELD_SIZE):
+                self.assertEqual(MUL_TABLE[a, b], slow_mul(a, b))
+
+    def test_inverse(self):
+        a = np.arange(1, FIELD_SIZE, dtype=np.uint8)
+        self.assertTrue(np.all(gf_mul(a, gf_inv(a)) == 1))
+        self.assertTrue(np.all(gf_div(a, a) == 1))
+
+    def test_add_is_xor(self):
+        a = np.arange(FIELD_SIZE, dtype=np.uint8)
+        self.assertTrue(np.all(gf_add(a, a) == 0))
+
+    def test_distributive(self):
+        rng = np.random.default_rng(0)
+        a, b, c = rng.integers(0, FIELD_SIZE, (3, 1000), dtype=np.uint8)
+        self.assertTrue(np.array_equal(gf_mul(a, b ^ c), gf_mul(a, b) ^ gf_mul(a, c)))
+
+    def test_bit_products_match_field_products(self):
+        rng = np.random.default_rng(1)
+        B = rng.integers(0, 2, (5, 9), dtype=np.uint8)
+        x = rng.integers(0, FIELD_SIZE, 9, dtype=np.uint8)
+        self.assertTrue(np.array_equal(bit_matvec(B, x), gf_matmul(B, x)))
+        C = rng.integers(0, 2, (9, 4), dtype=np.uint8)
+        self.assertTrue(np.array_equal(bit_matmul(B, C), (B.astype(int) @ C) % 2))
+
+    def test_packed_bit_matvec(self):
+        rng = np.random.default_rng(5)
+        B = rng.integers(0, 2, (6, 200), dtype=np.uint8)
+        x = rng.integers(0, FIELD_SIZE, 200, dtype=np.uint8)
+        words = pack_bit_rows(B)
+        self.assertEqual(words.shape, (6, 4))
+        self.assertTrue(np.array_equal(packed_bit_matvec(words, x), bit_matvec(B, x)))
+        X = rng.integers(0, FIELD_SIZE, (3, 200), dtype=np.uint8)
+        self.assertTrue(np.array_equal(packed_bit_matvec(words, X), bit_matvec(B[None], X[:, None])))
+
+    def test_packed_bit_matrix(self):
+        rng = np.random.default_rng(7)
+        # 70 columnas no llenan el último grupo de la tabla ni la última palabra
+        B = rng.integers(0, 2, (130, 70), dtype=np.uint8)
+        packed = PackedBitMatrix.from_bits(B)
+        x = rng.integers(0, FIELD_SIZE, 70, dtype=np.uint8)
+        self.assertTrue(np.array_equal(packed.matvec(x), bit_matvec(B, x)))
+        X = rng.integers(0, FIELD_SIZE, (2, 3, 70), dtype=np.uint8)
+        self.assertTrue(np.array_equal(packed.matvec(X), bit_matvec(B, X[..., None, :])))
+        self.assertEqual(packed.matvec(X[:0]).shape, (0, 3, 130))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from src import instrumentation
+from src.cache import PublicMapCache
+from src.keygen import generate_private_seed, generate_keys
+from src.sign import Sign, SigningKey, sign_batch
+from src.signature import encode_signature
+from src.utils_for_verify import verify_signature
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_seed = generate_private_seed()
+        cls.public_key, _, _ = generate_keys(cls.private_seed)
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(instrumentation.current())
+        Sign(self.private_seed, b"Sin instrumentar")
+        self.assertIsNone(instrumentation.current())
+
+    def test_sign_and_verify_stats(self):
+        message = b"Mensaje instrumentado"
+        cache = PublicMapCache()
+        with instrumentation.instrumented() as instance:
+            s, salt = Sign(self.private_seed, message)
+            signature = encode_signature(s, salt)
+            verify_signature(self.public_key, message, signature, cache=cache)
+            verify_signature(self.public_key, message, signature, cache=cache)
+        self.assertIsNone(instrumentation.current())
+
+        stats = instance.stats()
+        for name in ("SqueezePublicMap", "FindPk", "BuildAugmentedMatrix", "GaussianElimination", "Sign"):
+            self.assertGreater(stats["timers"][name]["calls"], 0)
+            self.assertGreaterEqual(stats["timers"][name]["total_s"], 0)
+        counters = stats["counters"]
+        self.assertGreater(counters["bytes_squeezed"], 0)
+        self.assertGreaterEqual(counters["sign_rounds"], 1)
+        self.assertEqual(counters["sign_retries"], counters["sign_rounds"] - 1)
+        self.assertEqual(counters["cache_misses"], 1)
+        self.assertEqual(counters["cache_hits"], 1)
+
+    def test_callback_receives_events(self):
+        events = []
+        instrumentation.enable(lambda name, value: events.append(name))
+        sign_batch(SigningKey(self.private_seed), [b"a", b"b"])
+        self.assertIn("GaussianElimination", events)
+        self.assertIn("sign_rounds", events)
+
+
+if __name__ == "__main__":
+    unittest.main()
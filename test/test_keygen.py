@@ -6,11 +6,17 @@ from src.utils import (
     SqueezePublicSeed,
     SqueezeT,
     SqueezePublicMap,
+    SqueezePublicMapStream,
     FindPk1,
     FindPk2,
+    FindAllPk1,
+    FindAllPk2,
     flatten_upper_triangular,
+    squeeze_bits_from_shake,
+    squeeze_packed_bits_from_shake,
+    select_shake_function,
 )
-from src.constants import m, v, SEED_SIZE, SECURITY_LEVEL
+from src.constants import m, v, n, SEED_SIZE, SECURITY_LEVEL
 
 
 class TestLUOV(unittest.TestCase):
@@ -23,7 +29,7 @@ class TestLUOV(unittest.TestCase):
     def test_initialize_and_absorb(self):
         seed = generate_private_seed()
         sponge = InitializeAndAbsorb(seed)
-        self.assertEqual(len(sponge), SEED_SIZE)
+        self.assertEqual(len(sponge), SEED_SIZE + v * ((m + 7) // 8))
         self.assertIsInstance(sponge, bytes)
 
     def test_squeeze_public_seed(self):
@@ -40,15 +46,43 @@ class TestLUOV(unittest.TestCase):
         self.assertEqual(T.shape, (v, m))
         self.assertTrue(np.all((T == 0) | (T == 1)))  # Check if T is binary
 
+    def test_t_is_not_derived_from_public_seed(self):
+        seed = generate_private_seed()
+        sponge = InitializeAndAbsorb(seed)
+        public_seed = SqueezePublicSeed(sponge)
+        T = SqueezeT(sponge)
+        # T no debe coincidir con el comienzo de la expansión pública (C || L || ...)
+        shake_output = select_shake_function(SECURITY_LEVEL)(public_seed).digest(v * m // 8 + 1)
+        public_bits = np.unpackbits(np.frombuffer(shake_output, dtype=np.uint8))[: v * m]
+        self.assertFalse(np.array_equal(T.ravel(), public_bits))
+
     def test_squeeze_public_map(self):
         seed = generate_private_seed()
         sponge = InitializeAndAbsorb(seed)
         public_seed = SqueezePublicSeed(sponge)
         C, L, Q1 = SqueezePublicMap(public_seed)
         self.assertEqual(C.shape, (m,))
-        self.assertEqual(L.shape, (m, v))
+        self.assertEqual(L.shape, (m, n))
         self.assertEqual(Q1.shape, (m, (v * (v + 1)) // 2 + v * m))
 
+    def test_squeeze_bits_from_shake(self):
+        shake_output = generate_private_seed()
+        expected = [int(bit) for byte in shake_output for bit in format(byte, "08b")][:203]
+        bits = squeeze_bits_from_shake(shake_output, 203)
+        self.assertEqual(bits.dtype, np.uint8)
+        self.assertEqual(bits.tolist(), expected)
+        packed = squeeze_packed_bits_from_shake(shake_output, 203)
+        self.assertEqual(packed.shape, (26,))
+        self.assertTrue(np.array_equal(np.unpackbits(packed, count=203), bits))
+
+    def test_squeeze_public_map_stream(self):
+        public_seed = generate_private_seed()
+        C, L, Q1 = SqueezePublicMap(public_seed)
+        C_s, L_s, rows = SqueezePublicMapStream(public_seed)
+        self.assertTrue(np.array_equal(C, C_s))
+        self.assertTrue(np.array_equal(L, L_s))
+        self.assertTrue(np.array_equal(Q1, np.array(list(rows))))
+
     def test_find_pk1(self):
         seed = generate_private_seed()
         sponge = InitializeAndAbsorb(seed)
@@ -65,6 +99,28 @@ class TestLUOV(unittest.TestCase):
         Pk2 = FindPk2(Q1, 0, v, m)
         self.assertEqual(Pk2.shape, (v, m))
 
+    def test_find_pk_column_layout(self):
+        # Q1 con el índice de columna en cada celda permite comprobar el orden
+        Q1 = np.tile(np.arange((v * (v + 1)) // 2 + v * m), (2, 1))
+        Pk1 = FindPk1(Q1, 1, v)
+        Pk2 = FindPk2(Q1, 1, v, m)
+        self.assertEqual(Pk1[0, 0], 0)
+        self.assertEqual(Pk1[0, v - 1], v - 1)
+        self.assertEqual(Pk2[0, 0], v)
+        self.assertEqual(Pk1[1, 1], v + m)
+        self.assertEqual(Pk2[v - 1, m - 1], Q1.shape[1] - 1)
+        self.assertEqual(Pk1[1, 0], 0)
+
+    def test_find_all_pk(self):
+        seed = generate_private_seed()
+        _, _, Q1 = SqueezePublicMap(seed)
+        Pk1 = FindAllPk1(Q1, v)
+        Pk2 = FindAllPk2(Q1, v, m)
+        self.assertEqual(Pk1.shape, (m, v, v))
+        self.assertEqual(Pk2.shape, (m, v, m))
+        self.assertTrue(np.array_equal(Pk1[5], FindPk1(Q1, 5, v)))
+        self.assertTrue(np.array_equal(Pk2[5], FindPk2(Q1, 5, v, m)))
+
     def test_flatten_upper_triangular(self):
         matrix = np.array([[1, 2, 3], [0, 4, 5], [0, 0, 6]])
         flattened = flatten_upper_triangular(matrix)
@@ -84,7 +140,7 @@ class TestLUOV(unittest.TestCase):
         _, _, Q1 = SqueezePublicMap(public_seed)
         T = SqueezeT(sponge)
         Q2 = find_Q2(Q1, T)
-        self.assertEqual(Q2.shape, (m, (m * (m + 1)) // 2//8))
+        self.assertEqual(Q2.shape, (m, ((m * (m + 1)) // 2 + 7) // 8))
 
     def test_keygen(self):
         seed = generate_private_seed()
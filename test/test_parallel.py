@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from src.keygen import generate_private_seed, generate_keys
+from src.parallel import ProcessPoolSigner
+from src.sign import SigningKey
+from src.signature import encode_signature
+from src.utils_for_verify import verify_signature
+
+
+class TestProcessPoolSigner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_seed = generate_private_seed()
+        cls.public_key, _, _ = generate_keys(cls.private_seed)
+
+    def test_sign_batch_across_processes(self):
+        messages = [f"Mensaje {index} para el pool".encode() for index in range(10)]
+        with ProcessPoolSigner(self.private_seed, processes=2, chunk_size=3) as signer:
+            S, salts = signer.sign_batch(messages)
+            empty, no_salts = signer.sign_batch([])
+
+        self.assertEqual(S.shape, (10, signer.params.n))
+        self.assertEqual(empty.shape[0], 0)
+        self.assertEqual(no_salts, [])
+        # Cada trabajador debe generar sus propios salts y vinagres
+        self.assertEqual(len(set(salts)), len(salts))
+        for message, s, salt in zip(messages, S, salts):
+            self.assertTrue(verify_signature(self.public_key, message, encode_signature(s, salt)))
+
+    def test_from_arrays_matches_signing_key(self):
+        signing_key = SigningKey(self.private_seed)
+        arrays = {name: getattr(signing_key, name) for name in SigningKey.ARRAYS}
+        rebuilt = SigningKey.from_arrays(signing_key.public_seed, arrays)
+        self.assertIsNone(rebuilt.private_seed)
+
+        h = np.zeros(signing_key.params.m, dtype=np.uint8)
+        vinegar = np.arange(signing_key.params.v, dtype=np.uint8) & 0x7F
+        np.testing.assert_array_equal(
+            rebuilt.build_augmented_matrix(h, vinegar),
+            signing_key.build_augmented_matrix(h, vinegar),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from src.keygen import generate_private_seed, generate_keys
+from src.params import (
+    PARAMETER_SETS,
+    DEFAULT_PARAMETERS,
+    get_parameter_set,
+    parameter_set_for,
+    parameters_of_public_key,
+)
+from src.cache import PublicMapCache
+from src.public_key import serialize_public_key, load_public_key
+from src.sign import BuildAugmentedMatrix, Sign, SigningKey, sign_batch
+from src.utils import IterPkBlocks, SqueezePublicMap, FindAllPk2
+from src.signature import encode_signature, encode_signatures
+from src.utils_for_verify import verify_signature, verify_batch
+from src.constants import SECURITY_LEVEL, m, v
+
+
+class TestParameterSets(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.params = get_parameter_set(3)
+        cls.private_seed = generate_private_seed()
+        cls.public_key, _, _ = generate_keys(cls.private_seed, cls.params)
+
+    def test_registry(self):
+        self.assertEqual(
+            [params.name for params in PARAMETER_SETS.values()],
+            ["LUOV-7-57-197", "LUOV-7-83-283", "LUOV-7-110-374"],
+        )
+        self.assertIs(DEFAULT_PARAMETERS, PARAMETER_SETS[SECURITY_LEVEL])
+        self.assertEqual((DEFAULT_PARAMETERS.m, DEFAULT_PARAMETERS.v), (m, v))
+        self.assertIs(get_parameter_set("LUOV-7-110-374"), PARAMETER_SETS[5])
+        self.assertIs(parameter_set_for(7, 83, 283), self.params)
+        with self.assertRaises(ValueError):
+            get_parameter_set(2)
+
+    def test_key_shapes(self):
+        _, Q2 = self.public_key
+        self.assertEqual(Q2.shape, (83, -(-(83 * 84 // 2) // 8)))
+        self.assertIs(parameters_of_public_key(self.public_key), self.params)
+
+    def test_sign_and_verify_at_level_3(self):
+        message = b"Mensaje firmado con LUOV-7-83-283"
+        s, salt = Sign(self.private_seed, message, params=self.params)
+        self.assertEqual(s.shape, (self.params.n,))
+
+        signature = encode_signature(s, salt, self.params)
+        self.assertEqual(len(signature), self.params.signature_size)
+        self.assertTrue(verify_signature(self.public_key, message, signature))
+        self.assertTrue(verify_signature(self.public_key, message, signature, cache=None))
+        self.assertFalse(verify_signature(self.public_key, b"Otro mensaje", signature))
+
+    def test_serialized_key_round_trip(self):
+        message = b"Clave serializada de nivel 3"
+        signing_key = SigningKey(self.private_seed, self.params)
+        S, salts = sign_batch(signing_key, [message, message])
+
+        public_key = load_public_key(serialize_public_key(self.public_key))
+        self.assertIs(parameters_of_public_key(public_key), self.params)
+        encoded = encode_signatures(S, salts, self.params)
+        items = [(message, bytes(row)) for row in encoded]
+        np.testing.assert_array_equal(verify_batch(public_key, items), [True, True])
+
+    def test_cache_separates_parameter_sets(self):
+        cache = PublicMapCache()
+        public_seed, _ = self.public_key
+        C1, L1, _ = cache.get(public_seed)
+        C3, L3, _ = cache.get(public_seed, self.params)
+        self.assertEqual(L1.shape, (m, m + v))
+        self.assertEqual(L3.shape, (self.params.m, self.params.n))
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_arrays_are_checked_against_parameters(self):
+        signing_key = SigningKey(self.private_seed, self.params)
+        C, L, Q1 = SqueezePublicMap(signing_key.public_seed, self.params)
+        h = np.zeros(self.params.m, dtype=np.uint8)
+        vinegar = np.arange(self.params.v, dtype=np.uint8) & 0x7F
+
+        # Sin params el juego se deduce de T; con el de otro nivel es un error
+        A = BuildAugmentedMatrix(C, L, Q1, signing_key.T, h, vinegar)
+        self.assertTrue(np.array_equal(A, signing_key.build_augmented_matrix(h, vinegar)))
+        with self.assertRaises(ValueError):
+            BuildAugmentedMatrix(C, L, Q1, signing_key.T, h, vinegar, DEFAULT_PARAMETERS)
+        with self.assertRaises(ValueError):
+            next(IterPkBlocks(Q1, DEFAULT_PARAMETERS))
+        with self.assertRaises(ValueError):
+            FindAllPk2(Q1, self.params.v, m)
+
+
+if __name__ == "__main__":
+    unittest.main()
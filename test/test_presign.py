@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from src.field import gf_matmul
+from src.keygen import generate_private_seed, generate_keys
+from src.presign import PresignPool
+from src.sign import InvertMatrixBatch, SigningKey
+from src.signature import encode_signature
+from src.utils_for_verify import verify_signature
+from src.constants import m
+
+
+class TestPresignPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        private_seed = generate_private_seed()
+        cls.public_key, _, _ = generate_keys(private_seed)
+        cls.signing_key = SigningKey(private_seed)
+
+    def test_invert_matrix_batch(self):
+        M = np.random.randint(0, 128, size=(4, m, m), dtype=np.uint8)
+        inverses, invertible = InvertMatrixBatch(M)
+        for matrix, inverse, ok in zip(M, inverses, invertible):
+            if ok:
+                np.testing.assert_array_equal(gf_matmul(matrix, inverse), np.eye(m, dtype=np.uint8))
+
+    def test_sign_with_pool(self):
+        with PresignPool(self.signing_key, depth=4, refill_threshold=1, background=False) as pool:
+            self.assertEqual(len(pool), 4)
+            for index in range(6):
+                message = f"Mensaje prefirmado {index}".encode()
+                s, salt = pool.sign(message)
+                self.assertTrue(verify_signature(self.public_key, message, encode_signature(s, salt)))
+            self.assertGreaterEqual(len(pool), 1)
+
+    def test_entries_are_single_use(self):
+        with PresignPool(self.signing_key, depth=4, refill_threshold=0, background=False) as pool:
+            first, second = pool.take(), pool.take()
+            self.assertFalse(np.array_equal(first.vinegar, second.vinegar))
+            first.solve(np.zeros(m, dtype=np.uint8))
+            with self.assertRaises(RuntimeError):
+                first.solve(np.zeros(m, dtype=np.uint8))
+
+    def test_background_refill(self):
+        with PresignPool(self.signing_key, depth=8, refill_threshold=6) as pool:
+            for _ in range(4):
+                pool.take()
+            pool._refill_thread.join()
+            self.assertEqual(len(pool), 8)
+
+    def test_empty_pool_presigns_inline(self):
+        with PresignPool(self.signing_key, depth=2, refill_threshold=0, background=False) as pool:
+            pool.take()
+            pool.take()
+            self.assertEqual(len(pool), 0)
+            message = b"Reserva agotada"
+            s, salt = pool.sign(message)
+            self.assertTrue(verify_signature(self.public_key, message, encode_signature(s, salt)))
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            PresignPool(self.signing_key, depth=4, refill_threshold=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import io
+import mmap
+import tempfile
+import unittest
+import numpy as np
+from src.keygen import generate_private_seed, generate_keys
+from src.signature import (
+    S_BYTES,
+    SIGNATURE_SIZE,
+    encode_signature,
+    decode_signature,
+    encode_signatures,
+    decode_signatures,
+)
+from src.sign import (
+    Sign,
+    SigningKey,
+    BuildAugmentedMatrix,
+    EliminationWorkspace,
+    GaussianElimination,
+    GaussianEliminationBatch,
+    sign_batch,
+)
+from src.utils_for_verify import (
+    verify_signature,
+    verify_batch,
+    EvaluatePublicMap,
+    EvaluatePublicMapPacked,
+)
+from src.sign import Hash, HashBatch, hash_message
+from src.utils import select_shake_function
+from src.constants import r, SECURITY_LEVEL
+from src.field import gf_matmul
+from src.utils import SqueezePublicMap, pack_public_map
+from src.constants import m, v, n
+
+
+class TestSign(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_seed = generate_private_seed()
+        cls.public_key, _, _ = generate_keys(cls.private_seed)
+        cls.signing_key = SigningKey(cls.private_seed)
+
+    def test_gaussian_elimination(self):
+        rng = np.random.default_rng(2)
+        LHS = rng.integers(0, 128, (m, m), dtype=np.uint8)
+        x = rng.integers(0, 128, m, dtype=np.uint8)
+        A = np.hstack((LHS, gf_matmul(LHS, x)[:, None]))
+        self.assertTrue(np.array_equal(GaussianElimination(A), x))
+
+    def test_gaussian_elimination_pivoting(self):
+        # Matriz de permutación: todos los pivotes diagonales son cero al inicio
+        LHS = np.roll(np.eye(m, dtype=np.uint8) * 5, 1, axis=0)
+        x = np.arange(m, dtype=np.uint8)
+        A = np.hstack((LHS, gf_matmul(LHS, x)[:, None]))
+        workspace = EliminationWorkspace(m)
+        self.assertTrue(np.array_equal(GaussianElimination(A, workspace), x))
+        self.assertTrue(np.array_equal(GaussianElimination(A, workspace), x))
+        self.assertTrue(np.array_equal(A[:, :m], LHS))
+
+    def test_gaussian_elimination_singular(self):
+        A = np.zeros((m, m + 1), dtype=np.uint8)
+        self.assertIsNone(GaussianElimination(A))
+
+    def test_sign_and_verify(self):
+        message = b"Mensaje de prueba"
+        s, salt = Sign(self.private_seed, message)
+        self.assertEqual(s.shape, (n,))
+        self.assertEqual(len(salt), 16)
+        signature = encode_signature(s, salt)
+        self.assertTrue(verify_signature(self.public_key, message, signature))
+        self.assertFalse(verify_signature(self.public_key, b"Otro mensaje", signature))
+
+    def test_signing_key_augmented_matrix(self):
+        rng = np.random.default_rng(3)
+        h = rng.integers(0, 128, m, dtype=np.uint8)
+        vinegar = rng.integers(0, 128, v, dtype=np.uint8)
+        key = self.signing_key
+        C, L, Q1 = SqueezePublicMap(key.public_seed)
+        expected = BuildAugmentedMatrix(C, L, Q1, key.T, h, vinegar)
+        self.assertTrue(np.array_equal(key.build_augmented_matrix(h, vinegar), expected))
+
+    def test_sign_with_signing_key(self):
+        message = b"Mensaje firmado con un contexto precalculado"
+        s, salt = Sign(self.signing_key, message)
+        self.assertTrue(verify_signature(self.public_key, message, encode_signature(s, salt)))
+
+    def test_gaussian_elimination_batch(self):
+        rng = np.random.default_rng(4)
+        A = rng.integers(0, 128, (5, m, m + 1), dtype=np.uint8)
+        A[2, :, 7] = 0
+        A[4, :, :m] = np.roll(np.eye(m, dtype=np.uint8) * 3, 1, axis=0)
+        solutions, solvable = GaussianEliminationBatch(A)
+        self.assertEqual(solvable.tolist(), [True, True, False, True, True])
+        for k in (0, 1, 3, 4):
+            self.assertTrue(np.array_equal(solutions[k], GaussianElimination(A[k])))
+
+    def test_sign_with_parallel_attempts(self):
+        message = b"Mensaje con varios intentos"
+        s, salt = Sign(self.signing_key, message, attempts=4)
+        self.assertTrue(verify_signature(self.public_key, message, encode_signature(s, salt)))
+
+    def test_hash_to_field(self):
+        messages = [b"", b"uno", b"dos" * 1000]
+        H = HashBatch(messages, m)
+        self.assertEqual(H.shape, (3, m))
+        for message, h in zip(messages, H):
+            digest = select_shake_function(SECURITY_LEVEL)(message).digest((m * r + 7) // 8)
+            bit_string = "".join(format(byte, "08b") for byte in digest)
+            expected = [int(bit_string[i : i + r], 2) for i in range(0, m * r, r)]
+            self.assertEqual(h.tolist(), expected)
+            self.assertTrue(np.array_equal(Hash(message, m), h))
+
+    def test_hash_message_streaming_inputs(self):
+        message = bytes(range(256)) * 5000
+        salt = b"s" * 16
+        expected = Hash(message + b"\x00" + salt, m)
+        chunks = (message[i : i + 1000] for i in range(0, len(message), 1000))
+        with tempfile.TemporaryFile() as payload:
+            payload.write(message)
+            payload.flush()
+            payload.seek(0)
+            mapped = mmap.mmap(payload.fileno(), 0, access=mmap.ACCESS_READ)
+            inputs = [message, memoryview(message), io.BytesIO(message), chunks, mapped, payload]
+            for data in inputs:
+                self.assertTrue(np.array_equal(hash_message(data, salt, m), expected))
+            mapped.close()
+
+        # Un arreglo no contiguo se hashea como su copia contigua
+        array = np.frombuffer(message, dtype=np.uint8).reshape(1000, -1).T
+        expected = hash_message(np.ascontiguousarray(array), salt, m)
+        self.assertTrue(np.array_equal(hash_message(array, salt, m), expected))
+        self.assertTrue(np.array_equal(hash_message(memoryview(array), salt, m), expected))
+
+    def test_sign_file_object(self):
+        message = b"contenido de un archivo grande" * 1000
+        s, salt = Sign(self.signing_key, io.BytesIO(message))
+        self.assertTrue(verify_signature(self.public_key, message, encode_signature(s, salt)))
+
+    def test_signature_encoding(self):
+        self.assertEqual(SIGNATURE_SIZE, 239)
+        rng = np.random.default_rng(6)
+        S = rng.integers(0, 128, (4, n), dtype=np.uint8)
+        salts = [bytes(rng.integers(0, 256, 16, dtype=np.uint8)) for _ in range(4)]
+        encoded = encode_signatures(S, salts)
+        self.assertEqual(encoded.shape, (4, SIGNATURE_SIZE))
+        decoded, decoded_salts = decode_signatures(encoded)
+        self.assertTrue(np.array_equal(decoded, S))
+        self.assertEqual(decoded_salts, salts)
+
+        signature = encode_signature(S[1], salts[1])
+        self.assertEqual(signature, encoded[1].tobytes())
+        s, salt = decode_signature(signature)
+        self.assertTrue(np.array_equal(s, S[1]))
+        self.assertEqual(salt, salts[1])
+        with self.assertRaises(ValueError):
+            decode_signature(signature[:-1])
+
+    def test_sign_batch(self):
+        messages = [b"mensaje %d" % i for i in range(20)]
+        S, salts = sign_batch(self.signing_key, messages)
+        self.assertEqual(S.shape, (20, n))
+        for message, s, salt in zip(messages, S, salts):
+            self.assertTrue(verify_signature(self.public_key, message, encode_signature(s, salt)))
+
+    def test_evaluate_public_map(self):
+        message = b"Mensaje evaluado"
+        s, salt = Sign(self.signing_key, message)
+        public_seed, Q2 = self.public_key
+        h = Hash(message + b"\x00" + salt, m)
+        self.assertTrue(np.array_equal(EvaluatePublicMap(public_seed, Q2, s), h))
+        self.assertTrue(np.array_equal(EvaluatePublicMap(public_seed, Q2, s, packed=True), h))
+        C, L, Q1 = SqueezePublicMap(public_seed)
+        packed = pack_public_map(L, Q1, v)
+        self.assertTrue(np.array_equal(EvaluatePublicMapPacked(C, packed, Q2, s), h))
+
+    def test_verify_batch(self):
+        messages = [b"mensaje %d" % i for i in range(20)]
+        S, salts = sign_batch(self.signing_key, messages)
+        items = [(msg, encode_signature(s, salt)) for msg, s, salt in zip(messages, S, salts)]
+        items[3] = (b"alterado", items[3][1])
+        items[7] = (items[7][0], items[7][1][1:])
+        mask = verify_batch(self.public_key, items)
+        expected = np.ones(20, dtype=bool)
+        expected[[3, 7]] = False
+        self.assertTrue(np.array_equal(mask, expected))
+        self.assertEqual(verify_batch(self.public_key, []).shape, (0,))
+
+    def test_padding_bits_are_rejected(self):
+        message = b"Firma con relleno alterado"
+        s, salt = Sign(self.signing_key, message)
+        signature = bytearray(encode_signature(s, salt))
+        self.assertTrue(verify_signature(self.public_key, message, bytes(signature)))
+
+        # El último byte de s tiene 8 * S_BYTES - n * r bits de relleno
+        signature[S_BYTES - 1] ^= 1
+        signature = bytes(signature)
+        with self.assertRaises(ValueError):
+            decode_signature(signature)
+        self.assertFalse(verify_signature(self.public_key, message, signature))
+        self.assertFalse(verify_signature(self.public_key, message, signature, cache=None))
+        mask = verify_batch(self.public_key, [(message, signature), (message, encode_signature(s, salt))])
+        self.assertTrue(np.array_equal(mask, [False, True]))
+
+
+if __name__ == "__main__":
+    unittest.main()
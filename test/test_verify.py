@@ -0,0 +1,157 @@
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+from src.cache import PublicMapCache
+from src.constants import m
+from src.keygen import generate_private_seed, generate_keys
+from src.keystore import KeyStore, write_keystore
+from src.public_key import (
+    HEADER,
+    serialize_public_key,
+    load_public_key,
+    load_public_key_file,
+)
+from src.signature import encode_signature
+from src.sign import Sign
+from src.utils import SqueezePublicMap
+from src.utils_for_verify import verify_signature, verify_batch
+
+
+class TestPublicMapCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = PublicMapCache()
+        seed = generate_private_seed()
+        C, L, Q1 = cache.get(seed)
+        C2, L2, Q12 = cache.get(seed)
+        self.assertIs(Q1, Q12)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertTrue(np.array_equal(Q1, SqueezePublicMap(seed)[2]))
+        self.assertFalse(Q1.flags.writeable)
+
+    def test_packed_entries_keep_only_what_verify_uses(self):
+        cache = PublicMapCache()
+        seed = generate_private_seed()
+        C, packed = cache.get_packed(seed)
+        self.assertIsNone(C.base)
+        self.assertEqual(cache.stats()["bytes"], C.nbytes + packed.table.nbytes)
+        self.assertIs(cache.get_packed(seed)[1], packed)
+        # (C, L, Q1) es otra entrada, que solo se guarda si se pide
+        cache.get(seed)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_lru_eviction(self):
+        cache = PublicMapCache(max_entries=2)
+        seeds = [generate_private_seed() for _ in range(3)]
+        for seed in seeds:
+            cache.get(seed)
+        cache.get(seeds[2])
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        cache.get(seeds[0])
+        self.assertEqual(cache.stats()["misses"], 4)
+
+    def test_byte_limit(self):
+        cache = PublicMapCache(max_bytes=1024)
+        cache.get(generate_private_seed())
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_concurrent_access(self):
+        cache = PublicMapCache(max_entries=1)
+        seed = generate_private_seed()
+        threads = [threading.Thread(target=cache.get, args=(seed,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 4)
+        self.assertEqual(stats["entries"], 1)
+
+
+class TestPublicKeyFormat(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_seed = generate_private_seed()
+        cls.public_key, _, cls.public_key_size_kb = generate_keys(cls.private_seed)
+
+    def test_roundtrip_is_zero_copy(self):
+        data = serialize_public_key(self.public_key)
+        self.assertAlmostEqual(len(data) / 1024, self.public_key_size_kb)
+        public_seed, Q2 = load_public_key(data)
+        self.assertEqual(public_seed, self.public_key[0])
+        self.assertEqual(Q2.shape[0], m)
+        self.assertEqual(Q2.ctypes.data % 8, 0)
+        self.assertFalse(Q2.flags.owndata)
+        self.assertTrue(np.array_equal(Q2[:, : self.public_key[1].shape[1]], self.public_key[1]))
+
+    def test_verify_with_mapped_key(self):
+        message = b"Mensaje verificado con una clave en disco"
+        s, salt = Sign(self.private_seed, message)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "clave.pub")
+            with open(path, "wb") as key_file:
+                key_file.write(serialize_public_key(self.public_key))
+            public_key = load_public_key_file(path)
+            self.assertTrue(verify_signature(public_key, message, encode_signature(s, salt)))
+            self.assertTrue(verify_signature(public_key, message, encode_signature(s, salt), cache=None))
+
+    def test_rejects_other_parameter_sets(self):
+        data = bytearray(serialize_public_key(self.public_key))
+        data[:HEADER.size] = HEADER.pack(b"LUOV", 1, 7, 60, 200, 3)
+        with self.assertRaises(ValueError):
+            load_public_key(bytes(data))
+
+
+class TestKeyStore(unittest.TestCase):
+
+    def test_lookup_and_verify_with_handle(self):
+        seeds = [generate_private_seed() for _ in range(3)]
+        keys = {f"clave-{i}": generate_keys(seed)[0] for i, seed in enumerate(seeds)}
+        message = b"Mensaje para el almacen de claves"
+        s, salt = Sign(seeds[1], message)
+        signature = encode_signature(s, salt)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "claves.lks")
+            write_keystore(path, keys)
+            with KeyStore(path) as store:
+                self.assertEqual(len(store), 3)
+                self.assertIn("clave-2", store)
+                self.assertNotIn("clave-9", store)
+                with self.assertRaises(KeyError):
+                    store.get("clave-9")
+
+                handle = store.get("clave-1")
+                self.assertEqual(handle.public_seed, keys["clave-1"][0])
+                self.assertFalse(handle.Q2.flags.owndata)
+                self.assertTrue(verify_signature(handle, message, signature))
+                self.assertFalse(verify_signature(store.get("clave-0"), message, signature))
+                self.assertEqual(verify_batch(handle, [(message, signature)]).tolist(), [True])
+                del handle
+
+    def test_rejects_ambiguous_key_ids(self):
+        public_key = generate_keys(generate_private_seed())[0]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "claves.lks")
+            # El índice rellena con ceros: b"a\x00" no se distinguiría de "a"
+            with self.assertRaises(ValueError):
+                write_keystore(path, {b"a\x00": public_key})
+            # "a" y b"a" son el mismo identificador una vez codificados
+            with self.assertRaises(ValueError):
+                write_keystore(path, {b"a": public_key, "a": public_key})
+
+            write_keystore(path, {"a": public_key})
+            with KeyStore(path) as store:
+                self.assertEqual(len(store), 1)
+                with self.assertRaises(ValueError):
+                    store.get(b"a\x00")
+
+
+if __name__ == "__main__":
+    unittest.main()